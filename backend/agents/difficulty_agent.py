@@ -105,7 +105,7 @@ class DifficultyAgent(Agent):
         if not quiz_history:
             return "Starting with recommended difficulty based on age and experience level."
 
-        recent_quizzes = quiz_history[-5:]
+        recent_quizzes = quiz_history[:5]  # quiz_history is ordered DESC
         avg_score = sum(q.get("score", 0) for q in recent_quizzes) / len(recent_quizzes)
 
         if difficulty == "easy":
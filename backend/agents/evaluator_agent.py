@@ -45,8 +45,11 @@ class EvaluatorAgent(Agent):
                     "agent": self.name
                 }
 
+            # Compare each answer once; score and per-question feedback both reuse it
+            correct_flags = self._correct_flags(questions, answers)
+            
             # Calculate score
-            score_info = self._calculate_score(questions, answers)
+            score_info = self._calculate_score(questions, correct_flags)
             
             # Generate feedback
             feedback = self._generate_feedback(questions, answers, score_info, user_profile)
@@ -58,7 +61,7 @@ class EvaluatorAgent(Agent):
                 "percentage": score_info["percentage"],
                 "correct_count": score_info["correct_count"],
                 "feedback": feedback,
-                "question_feedback": self._get_question_feedback(questions, answers),
+                "question_feedback": self._get_question_feedback(questions, answers, correct_flags),
                 "agent": self.name
             }
 
@@ -70,18 +73,18 @@ class EvaluatorAgent(Agent):
                 "agent": self.name
             }
 
-    def _calculate_score(self, questions: List[dict], answers: List[int]) -> Dict[str, Any]:
+    def _correct_flags(self, questions: List[dict], answers: List[int]) -> List[bool]:
+        """Whether each question was answered correctly (unanswered questions are incorrect)"""
+        flags = [answer == question.get("correct_answer", -1) for question, answer in zip(questions, answers)]
+        flags.extend([False] * (len(questions) - len(flags)))
+        return flags
+
+    def _calculate_score(self, questions: List[dict], correct_flags: List[bool]) -> Dict[str, Any]:
         """Calculate quiz score"""
 
-        correct_count = 0
+        correct_count = sum(correct_flags)
         max_score = len(questions)
 
-        for i, question in enumerate(questions):
-            if i < len(answers):
-                correct_answer = question.get("correct_answer", -1)
-                if answers[i] == correct_answer:
-                    correct_count += 1
-
         percentage = (correct_count / max_score * 100) if max_score > 0 else 0
 
         return {
@@ -113,14 +116,15 @@ class EvaluatorAgent(Agent):
 
         return feedback
 
-    def _get_question_feedback(self, questions: List[dict], answers: List[int]) -> List[dict]:
+    def _get_question_feedback(
+        self, questions: List[dict], answers: List[int], correct_flags: List[bool]
+    ) -> List[dict]:
         """Generate feedback for each question"""
 
         feedback_list = []
 
-        for i, question in enumerate(questions):
+        for i, (question, is_correct) in enumerate(zip(questions, correct_flags)):
             correct_answer = question.get("correct_answer", -1)
-            is_correct = i < len(answers) and answers[i] == correct_answer
             
             user_answer_text = ""
             if i < len(answers):
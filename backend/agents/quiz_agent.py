@@ -7,7 +7,10 @@ Uses PDF topics and content combined with GPT-4o for personalization
 import logging
 import json
 import os
-from typing import Dict, List, Any
+import random
+import re
+from itertools import islice
+from typing import Dict, FrozenSet, List, Any
 from .base_agent import Agent
 
 logger = logging.getLogger(__name__)
@@ -20,15 +23,24 @@ except ImportError:
     PDF_GENERATOR_AVAILABLE = False
 
 
+# Runs of whitespace (including newlines from generated text) collapse to one space
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def question_key(text: str) -> str:
+    """Normalized question text used to spot questions the user has already seen"""
+    return WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+
+
 class QuizAgent(Agent):
     """Generates personalized quiz questions from PDF content"""
 
-    def __init__(self):
+    def __init__(self, pdf_extractor=None):
         super().__init__("QuizAgent")
         
         # Initialize PDF-based question generator
         if PDF_GENERATOR_AVAILABLE:
-            self.pdf_generator = PDFBasedQuestionGenerator()
+            self.pdf_generator = PDFBasedQuestionGenerator(pdf_extractor)
             logger.info("✅ PDF-based question generator initialized")
         else:
             self.pdf_generator = None
@@ -87,11 +99,12 @@ class QuizAgent(Agent):
                         "agent": self.name
                     }
 
-            # Get questions user has already answered correctly
-            correctly_answered = []
+            # Get questions user has already answered correctly, keyed once for every filter below
+            mastered = frozenset()
             if database and user_id:
                 try:
                     correctly_answered = database.get_correctly_answered_questions(user_id, limit=30)
+                    mastered = frozenset(question_key(qa.get("question", "")) for qa in correctly_answered)
                 except Exception as e:
                     logger.warning(f"Could not fetch answered questions: {e}")
 
@@ -111,7 +124,7 @@ class QuizAgent(Agent):
                         self.question_cache[cache_key] = questions
                         
                         # Filter out questions user has already answered correctly
-                        questions = self._filter_answered_questions(questions, correctly_answered)
+                        questions = self._filter_answered_questions(questions, mastered)
                         
                         logger.info(f"Generated {len(questions)} questions from GPT-4o for topic: {topic}")
                         return {
@@ -129,7 +142,7 @@ class QuizAgent(Agent):
             
             # Step 2: Final fallback to template-based questions
             questions = self._generate_from_templates(
-                topic, difficulty, num_questions, user_profile, correctly_answered
+                topic, difficulty, num_questions, user_profile, mastered
             )
             
 
@@ -152,36 +165,34 @@ class QuizAgent(Agent):
             }
 
     def _filter_answered_questions(
-        self, questions: List[Dict[str, Any]], correctly_answered: List[Dict[str, Any]]
+        self, questions: List[Dict[str, Any]], mastered: FrozenSet[str]
     ) -> List[Dict[str, Any]]:
         """
         Filter out questions that the user has already answered correctly
         
         Args:
             questions: List of generated questions
-            correctly_answered: List of questions user got right (contains 'question_text')
+            mastered: question_key() of every question the user got right
         
         Returns:
             Filtered list of new questions
         """
-        if not correctly_answered:
+        if not mastered:
             return questions
         
-        # Extract question text from correctly answered questions
-        answered_texts = {qa.get("question_text", "").lower().strip() for qa in correctly_answered}
+        # Usually nothing repeats, so check that before building a filtered copy
+        keys = [question_key(q.get("question", "")) for q in questions]
+        if all(keys) and mastered.isdisjoint(keys):
+            return questions
         
         # Filter out duplicate/similar questions
-        filtered = []
-        for q in questions:
-            q_text = q.get("question", "").lower().strip()
-            if q_text and q_text not in answered_texts:
-                filtered.append(q)
+        filtered = [q for q, q_text in zip(questions, keys) if q_text and q_text not in mastered]
         
         return filtered if filtered else questions
 
     def _generate_from_templates(
         self, topic: str, difficulty: str, num_questions: int, user_profile: dict,
-        correctly_answered: List[Dict[str, Any]] = None
+        mastered: FrozenSet[str] = frozenset()
     ) -> List[Dict[str, Any]]:
         """
         Fallback: Generate questions from templates
@@ -198,22 +209,22 @@ class QuizAgent(Agent):
         else:
             question_bank = self._get_medium_bank(topic_lower, user_profile)
         
-        # Filter out questions user has already mastered
-        if correctly_answered:
-            correctly_answered_questions = {q.get("question", "") for q in correctly_answered}
-            filtered_bank = [q for q in question_bank if q.get("question", "") not in correctly_answered_questions]
-            question_bank = filtered_bank if filtered_bank else question_bank  # Use original if all filtered
+        # Take the first questions the user hasn't mastered, stopping once there are enough
+        selected = list(islice(
+            (q for q in question_bank if question_key(q.get("question", "")) not in mastered),
+            num_questions
+        ))
+        if not selected:
+            selected = question_bank[:num_questions]  # Use original if all filtered
         
         # Shuffle correct answer positions to avoid pattern
-        for q in question_bank:
+        for q in selected:
             self._shuffle_options(q)
         
-        return question_bank[:num_questions]
+        return selected
 
     def _shuffle_options(self, question: Dict[str, Any]) -> None:
         """Randomize option positions while tracking correct answer"""
-        import random
-        
         correct_option = question["options"][question["correct_answer"]]
         options = question["options"][:]
         random.shuffle(options)
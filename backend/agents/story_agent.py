@@ -84,7 +84,7 @@ class StoryAgent(Agent):
 
         # Add RAG context if available
         if rag_context:
-            story += f"\n\n[Based on: {rag_context[:100]}...]"
+            story += f"\n\n[Based on: {rag_context:.100}...]"
 
         return story
 
@@ -4,18 +4,50 @@ Handles all database operations for users, quizzes, gamification, and traces
 """
 
 import sqlite3
-import json
 import logging
+import os
+import threading
 import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from pathlib import Path
 from .models import User, QuizAttempt, GamificationEvent, TraceLog
+from backend.services import json_utils
 
 logger = logging.getLogger(__name__)
 
-# Database path - in project root
+# Database path - in project root, overridable with MONEYTALES_DB_PATH
 DB_PATH = Path(__file__).parent.parent.parent / "moneytales.db"
+IN_MEMORY_DB = ":memory:"
+
+# PRAGMA user_version once mastered_questions has been backfilled from quiz_attempts
+MASTERED_BACKFILL_VERSION = 1
+
+
+class ReusableConnection:
+    """
+    A thread's SQLite connection as handed out by Database.get_connection
+    close() only discards uncommitted work, keeping the connection open for the next call
+    """
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def close(self):
+        """Roll back anything left uncommitted, as closing the connection would"""
+        if self._conn.in_transaction:
+            self._conn.rollback()
 
 
 class Database:
@@ -23,16 +55,44 @@ class Database:
 
     def __init__(self, db_path: str = None):
         """Initialize database connection"""
-        self.db_path = db_path or str(DB_PATH)
+        self.db_path = db_path or os.getenv("MONEYTALES_DB_PATH") or str(DB_PATH)
+        self.in_memory = self.db_path == IN_MEMORY_DB
+        self._memory_anchor = None
+        # One connection per thread, reused across calls instead of reopened each time
+        self._local = threading.local()
+        if self.in_memory:
+            # Each thread has its own connection, so they share one named
+            # in-memory database, kept alive by a connection held open here
+            self.db_path = f"file:moneytales-{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._memory_anchor = self._connect()
         self.init_db()
 
-    def get_connection(self):
-        """Get database connection with proper settings for concurrent access"""
-        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+    def get_connection(self) -> ReusableConnection:
+        """
+        Get this thread's database connection, opening it on first use
+        Callers close() it as before; that only rolls back uncommitted work
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = ReusableConnection(self._connect())
+            self._local.connection = conn
+        elif conn.in_transaction:
+            # A previous call failed before commit or close; don't let the next commit include its writes
+            conn.rollback()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with proper settings for concurrent access"""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False, uri=self.in_memory)
         conn.row_factory = sqlite3.Row
-        # Enable WAL mode for better concurrency
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
+        if self.in_memory:
+            # Nothing to make durable: keep the journal in RAM and skip syncs
+            conn.execute("PRAGMA journal_mode=MEMORY")
+            conn.execute("PRAGMA synchronous=OFF")
+        else:
+            # Enable WAL mode for better concurrency
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
         return conn
 
     def init_db(self):
@@ -74,6 +134,31 @@ class Database:
             )
         """)
 
+        # Per-user history, counts and aggregates all filter attempts by user
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_attempts_user
+            ON quiz_attempts(user_id, created_at)
+        """)
+
+        # Questions each user has answered correctly, kept in step with quiz_attempts
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS mastered_questions (
+                user_id TEXT NOT NULL,
+                question TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                correct_answer TEXT DEFAULT '',
+                options TEXT DEFAULT '[]',
+                created_at TEXT NOT NULL,
+                PRIMARY KEY(user_id, question),
+                FOREIGN KEY(user_id) REFERENCES users(user_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mastered_user
+            ON mastered_questions(user_id, created_at)
+        """)
+
         # Gamification events table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS gamification_events (
@@ -127,6 +212,26 @@ class Database:
                 logger.info("Adding 'feedback' column to quiz_attempts table")
                 cursor.execute("ALTER TABLE quiz_attempts ADD COLUMN feedback TEXT DEFAULT ''")
             
+            # Backfill mastered questions from attempts recorded before the table existed,
+            # once per database file rather than on every startup
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] < MASTERED_BACKFILL_VERSION:
+                cursor.execute("""
+                    SELECT user_id, topic, difficulty, responses, created_at FROM quiz_attempts
+                    WHERE responses != '' ORDER BY created_at
+                """)
+                rows = [
+                    mastered_row
+                    for row in cursor.fetchall()
+                    for mastered_row in self._mastered_rows(
+                        row["user_id"], row["topic"], row["difficulty"], row["responses"], row["created_at"]
+                    )
+                ]
+                if rows:
+                    logger.info(f"Backfilling {len(rows)} mastered questions")
+                    self._insert_mastered_rows(cursor, rows)
+                cursor.execute(f"PRAGMA user_version = {MASTERED_BACKFILL_VERSION}")
+            
             conn.commit()
             conn.close()
         except Exception as e:
@@ -151,6 +256,22 @@ class Database:
             logger.error(f"Error creating user: {e}")
             return False
 
+    def create_users_bulk(self, users: List[User]) -> int:
+        """Insert many users in one transaction, skipping ids that already exist"""
+        try:
+            conn = self.get_connection()
+            with conn:
+                cursor = conn.executemany("""
+                    INSERT OR IGNORE INTO users (user_id, name, age, hobbies, level, points, badges, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(u.user_id, u.name, u.age, u.hobbies, u.level, u.points, u.badges, u.created_at) for u in users])
+            conn.close()
+            logger.info(f"{cursor.rowcount} of {len(users)} users created")
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error creating users: {e}")
+            return 0
+
     def get_user(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
         try:
@@ -248,6 +369,16 @@ class Database:
                   attempt.difficulty, attempt.score, attempt.max_score, 
                   attempt.time_taken_seconds, attempt.answered_questions, 
                   attempt.correct_answers, attempt.responses or "", attempt.feedback or "", attempt.created_at))
+            # Mastered questions are derived data; a bad row must not cost the attempt itself
+            cursor.execute("SAVEPOINT mastered")
+            try:
+                self._insert_mastered_rows(cursor, self._mastered_rows(
+                    attempt.user_id, attempt.topic, attempt.difficulty, attempt.responses, attempt.created_at
+                ))
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                cursor.execute("ROLLBACK TO mastered")
+                logger.warning(f"Could not record mastered questions for attempt {attempt.attempt_id}: {e}")
+            cursor.execute("RELEASE mastered")
             conn.commit()
             conn.close()
             return True
@@ -255,6 +386,58 @@ class Database:
             logger.error(f"Error creating quiz attempt: {e}")
             return False
 
+    @staticmethod
+    def _mastered_rows(user_id: str, topic: str, difficulty: str,
+                       responses_text: str, created_at: str) -> List[tuple]:
+        """Rows for mastered_questions from one attempt's responses JSON"""
+        if not responses_text:
+            return []
+        try:
+            responses = json_utils.loads(responses_text)
+        except (json_utils.JSONDecodeError, TypeError) as e:
+            logger.debug(f"Could not parse responses for attempt: {e}")
+            return []
+        if not isinstance(responses, list):
+            return []
+
+        return [
+            (user_id, str(response["question"]),
+             response.get("topic") or topic or "", response.get("difficulty") or difficulty or "",
+             str(response.get("correct_answer", "")),
+             json_utils.dumps(response.get("options", [])), created_at)
+            for response in responses
+            if isinstance(response, dict) and response.get("is_correct", False) and response.get("question")
+        ]
+
+    @staticmethod
+    def _insert_mastered_rows(cursor, rows: List[tuple]):
+        """Upsert mastered questions so each keeps its latest details"""
+        if rows:
+            cursor.executemany("""
+                INSERT OR REPLACE INTO mastered_questions
+                (user_id, question, topic, difficulty, correct_answer, options, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    @staticmethod
+    def _attempt_from_row(row: sqlite3.Row, columns: frozenset, user_id: str) -> QuizAttempt:
+        """Build a QuizAttempt from a quiz_attempts row, defaulting any column the row lacks"""
+        return QuizAttempt(
+            attempt_id=row["attempt_id"] if "attempt_id" in columns else str(uuid.uuid4()),
+            user_id=row["user_id"] if "user_id" in columns else user_id,
+            quiz_id=row["quiz_id"] if "quiz_id" in columns else "",
+            topic=row["topic"] if "topic" in columns else "",
+            difficulty=row["difficulty"] if "difficulty" in columns else "medium",
+            score=row["score"] if "score" in columns else 0,
+            max_score=row["max_score"] if "max_score" in columns else 5,
+            time_taken_seconds=row["time_taken_seconds"] if "time_taken_seconds" in columns else 0,
+            answered_questions=row["answered_questions"] if "answered_questions" in columns else 0,
+            correct_answers=row["correct_answers"] if "correct_answers" in columns else 0,
+            responses=(row["responses"] if "responses" in columns else "") or "",
+            feedback=(row["feedback"] if "feedback" in columns else "") or "",
+            created_at=row["created_at"] if "created_at" in columns else ""
+        )
+
     def get_user_quiz_history(self, user_id: str, limit: int = 10) -> List[QuizAttempt]:
         """Get user's quiz history"""
         try:
@@ -267,37 +450,12 @@ class Database:
             rows = cursor.fetchall()
             conn.close()
 
+            # Column names are the same for every row, so look them up once
+            columns = frozenset(col[0] for col in cursor.description) if cursor.description else frozenset()
             attempts = []
             for row in rows:
                 try:
-                    # Handle optional fields that might not exist
-                    responses = ""
-                    feedback = ""
-                    try:
-                        responses = row["responses"] if row["responses"] else ""
-                    except (KeyError, TypeError, IndexError):
-                        pass
-                    try:
-                        feedback = row["feedback"] if row["feedback"] else ""
-                    except (KeyError, TypeError, IndexError):
-                        pass
-                    
-                    attempt = QuizAttempt(
-                        attempt_id=row["attempt_id"] if "attempt_id" in row.keys() else str(uuid.uuid4()),
-                        user_id=row["user_id"] if "user_id" in row.keys() else user_id,
-                        quiz_id=row["quiz_id"] if "quiz_id" in row.keys() else "",
-                        topic=row["topic"] if "topic" in row.keys() else "",
-                        difficulty=row["difficulty"] if "difficulty" in row.keys() else "medium",
-                        score=row["score"] if "score" in row.keys() else 0,
-                        max_score=row["max_score"] if "max_score" in row.keys() else 5,
-                        time_taken_seconds=row["time_taken_seconds"] if "time_taken_seconds" in row.keys() else 0,
-                        answered_questions=row["answered_questions"] if "answered_questions" in row.keys() else 0,
-                        correct_answers=row["correct_answers"] if "correct_answers" in row.keys() else 0,
-                        responses=responses,
-                        feedback=feedback,
-                        created_at=row["created_at"] if "created_at" in row.keys() else ""
-                    )
-                    attempts.append(attempt)
+                    attempts.append(self._attempt_from_row(row, columns, user_id))
                 except Exception as row_error:
                     logger.warning(f"Error processing quiz history row: {row_error}, skipping row")
                     continue
@@ -315,37 +473,12 @@ class Database:
             rows = cursor.fetchall()
             conn.close()
 
+            # Column names are the same for every row, so look them up once
+            columns = frozenset(col[0] for col in cursor.description) if cursor.description else frozenset()
             attempts = []
             for row in rows:
                 try:
-                    # Handle optional fields that might not exist
-                    responses = ""
-                    feedback = ""
-                    try:
-                        responses = row["responses"] if row["responses"] else ""
-                    except (KeyError, TypeError, IndexError):
-                        pass
-                    try:
-                        feedback = row["feedback"] if row["feedback"] else ""
-                    except (KeyError, TypeError, IndexError):
-                        pass
-                    
-                    attempt = QuizAttempt(
-                        attempt_id=row["attempt_id"] if "attempt_id" in row.keys() else str(uuid.uuid4()),
-                        user_id=row["user_id"] if "user_id" in row.keys() else user_id,
-                        quiz_id=row["quiz_id"] if "quiz_id" in row.keys() else "",
-                        topic=row["topic"] if "topic" in row.keys() else "",
-                        difficulty=row["difficulty"] if "difficulty" in row.keys() else "medium",
-                        score=row["score"] if "score" in row.keys() else 0,
-                        max_score=row["max_score"] if "max_score" in row.keys() else 5,
-                        time_taken_seconds=row["time_taken_seconds"] if "time_taken_seconds" in row.keys() else 0,
-                        answered_questions=row["answered_questions"] if "answered_questions" in row.keys() else 0,
-                        correct_answers=row["correct_answers"] if "correct_answers" in row.keys() else 0,
-                        responses=responses,
-                        feedback=feedback,
-                        created_at=row["created_at"] if "created_at" in row.keys() else ""
-                    )
-                    attempts.append(attempt)
+                    attempts.append(self._attempt_from_row(row, columns, user_id))
                 except Exception as row_error:
                     logger.warning(f"Error processing quiz attempt row: {row_error}, skipping row")
                     continue
@@ -371,6 +504,36 @@ class Database:
             logger.error(f"Error getting average score: {e}")
             return 0
 
+    def get_user_quiz_summary(self, user_id: str) -> Dict[str, Any]:
+        """Get user's quiz count and average score in one aggregate query"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*) as quiz_count, AVG(CAST(score AS FLOAT)) as avg_score
+                FROM quiz_attempts WHERE user_id = ?
+            """, (user_id,))
+            row = cursor.fetchone()
+            conn.close()
+            avg_score = row["avg_score"] if row["avg_score"] is not None else 0
+            return {"quizzes_completed": row["quiz_count"], "average_score": round(float(avg_score), 2)}
+        except Exception as e:
+            logger.error(f"Error getting quiz summary: {e}")
+            return {"quizzes_completed": 0, "average_score": 0}
+
+    def get_user_topics(self, user_id: str) -> List[str]:
+        """Get the distinct topics a user has taken quizzes on"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT topic FROM quiz_attempts WHERE user_id = ?", (user_id,))
+            topics = [row["topic"] for row in cursor.fetchall()]
+            conn.close()
+            return topics
+        except Exception as e:
+            logger.error(f"Error getting user topics: {e}")
+            return []
+
     # ==================== GAMIFICATION OPERATIONS ====================
 
     def create_gamification_event(self, event: GamificationEvent) -> bool:
@@ -492,56 +655,32 @@ class Database:
 
     def get_correctly_answered_questions(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """
-        Get questions the user has answered correctly
+        Get questions the user has answered correctly, most recent first
         Returns a list of dicts with question details
         """
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            # Get all quiz attempts for user with responses
             cursor.execute("""
-                SELECT responses, topic, difficulty FROM quiz_attempts 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC 
+                SELECT question, topic, difficulty, correct_answer, options
+                FROM mastered_questions
+                WHERE user_id = ?
+                ORDER BY created_at DESC
                 LIMIT ?
-            """, (user_id, limit * 5))  # Get more to account for filtering
-            
+            """, (user_id, limit))
             rows = cursor.fetchall()
             conn.close()
             
-            correctly_answered = []
-            seen_questions = set()
-            
-            for row in rows:
-                try:
-                    responses_text = row["responses"] if row["responses"] else ""
-                    if not responses_text:
-                        continue
-                        
-                    responses_data = json.loads(responses_text)
-                    if not isinstance(responses_data, list):
-                        continue
-                    
-                    for response in responses_data:
-                        # Only add if user answered correctly
-                        if response.get("is_correct", False):
-                            question_text = response.get("question", "")
-                            if question_text and question_text not in seen_questions:
-                                correctly_answered.append({
-                                    "question": question_text,
-                                    "topic": response.get("topic", row["topic"]),
-                                    "difficulty": response.get("difficulty", row["difficulty"]),
-                                    "correct_answer": response.get("correct_answer", ""),
-                                    "options": response.get("options", [])
-                                })
-                                seen_questions.add(question_text)
-                except (json.JSONDecodeError, KeyError, TypeError) as e:
-                    logger.debug(f"Could not parse responses for attempt: {e}")
-                    continue
-            
-            return correctly_answered[:limit]
+            return [
+                {
+                    "question": row["question"],
+                    "topic": row["topic"],
+                    "difficulty": row["difficulty"],
+                    "correct_answer": row["correct_answer"],
+                    "options": json_utils.loads(row["options"] or "[]")
+                }
+                for row in rows
+            ]
         except Exception as e:
             logger.error(f"Error getting correctly answered questions: {e}")
             return []
-
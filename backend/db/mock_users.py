@@ -36,16 +36,18 @@ MOCK_USERS = [
 
 
 def seed_mock_users(db: Database):
-    """Seed database with mock users"""
-    for user_data in MOCK_USERS:
-        user = User(
+    """Seed database with mock users in a single transaction"""
+    users = [
+        User(
             user_id=user_data["user_id"],
             name=user_data["name"],
             age=user_data["age"],
             hobbies=user_data["hobbies"]
         )
-        db.create_user(user)
-        print(f"Created user: {user.name} ({user.user_id})")
+        for user_data in MOCK_USERS
+    ]
+    created = db.create_users_bulk(users)
+    print(f"Created {created} mock users ({len(users) - created} already present)")
 
 
 def get_mock_user_profile(user_id: str) -> dict:
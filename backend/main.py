@@ -9,6 +9,7 @@ import sys
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 
 # Load environment variables from .env file
@@ -44,7 +45,9 @@ from backend.agents.evaluator_agent import EvaluatorAgent
 from backend.agents.gamification_agent import GamificationAgent
 
 # Import services
+from backend.services.pdf_content_extractor import PDFContentExtractor
 from backend.services.topic_suggester import TopicSuggester
+from backend.services.json_utils import ORJSON_AVAILABLE
 
 # Import routers
 from backend.routers.quiz_router import setup_quiz_router
@@ -101,8 +104,10 @@ async def lifespan(app: FastAPI):
         rag_manager = RAGManager()  # Use empty RAG as fallback
     
     # Initialize topic suggester
+    # One PDF extractor is shared by the topic suggester and the quiz agent
     logger.info("📚 Initializing topic suggester...")
-    topic_suggester = TopicSuggester()
+    pdf_extractor = PDFContentExtractor()
+    topic_suggester = TopicSuggester(pdf_extractor)
     
     # Initialize orchestrator
     logger.info("🎭 Initializing orchestrator...")
@@ -110,7 +115,7 @@ async def lifespan(app: FastAPI):
     
     # Register agents
     orchestrator.register_agent("StoryAgent", StoryAgent())
-    orchestrator.register_agent("QuizAgent", QuizAgent())
+    orchestrator.register_agent("QuizAgent", QuizAgent(pdf_extractor))
     orchestrator.register_agent("DifficultyAgent", DifficultyAgent())
     orchestrator.register_agent("RAGAgent", RAGAgent(rag_manager))
     orchestrator.register_agent("EvaluatorAgent", EvaluatorAgent())
@@ -129,7 +134,7 @@ async def lifespan(app: FastAPI):
     gamification_router = setup_gamification_router(orchestrator, db)
     app.include_router(gamification_router)
     
-    auth_router = setup_auth_router(db)
+    auth_router = setup_auth_router(db, topic_suggester)
     app.include_router(auth_router)
     
     topics_router = setup_topics_router(db, topic_suggester)
@@ -149,7 +154,9 @@ app = FastAPI(
     title="MoneyTales API",
     description="Financial Education Platform for Kids",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Encode responses with orjson when it is installed, stdlib json otherwise
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 )
 
 # Add CORS middleware
@@ -5,11 +5,14 @@ Main execution engine for the platform
 """
 
 import logging
+import time
 import uuid
-import json
 from typing import Dict, Any, List
 from datetime import datetime
 
+from backend.db.models import QuizAttempt, TraceLog, User
+from backend.services import json_utils
+
 logger = logging.getLogger(__name__)
 
 
@@ -72,13 +75,11 @@ class Orchestrator:
                     break
                 if attempt < max_retries - 1:
                     logger.warning(f"User {user_id} not found on attempt {attempt + 1}, retrying...")
-                    import time
                     time.sleep(0.3)
             
             if not user:
                 # Try to create a default user if not found (emergency fallback)
                 logger.warning(f"User {user_id} not found, attempting to create default user as fallback")
-                from backend.db.models import User
                 try:
                     default_user = User(
                         user_id=user_id,
@@ -131,7 +132,8 @@ class Orchestrator:
             step += 1
             self._log_trace(request_id, step, "DifficultyAgent", "Analyzing Difficulty", "in_progress", {})
             
-            quiz_history = self.database.get_user_quiz_history(user_id)
+            # Newest first; difficulty and personalization only look at the last five quizzes
+            quiz_history = self.database.get_user_quiz_history(user_id, limit=5)
             difficulty_agent = self.agents.get("DifficultyAgent")
             difficulty_result = difficulty_agent.execute(
                 user_performance={"quiz_history": [
@@ -176,7 +178,7 @@ class Orchestrator:
                     "percentage": q.score if hasattr(q, 'score') and isinstance(q.score, (int, float)) else 0,
                     "difficulty": q.difficulty if hasattr(q, 'difficulty') else "medium"
                 }
-                for q in quiz_history[-5:]  # Last 5 quizzes for context
+                for q in quiz_history  # Last 5 quizzes for context
             ]
             
             quiz_agent = self.agents.get("QuizAgent")
@@ -282,14 +284,15 @@ class Orchestrator:
             step += 1
             self._log_trace(request_id, step, "GamificationAgent", "Processing Rewards", "in_progress", {})
             
-            quiz_history = self.database.get_user_quiz_history(user_id, limit=100)
+            # Only the count is needed, so don't load the attempt rows themselves
+            quizzes_completed = self.database.get_user_quiz_summary(user_id)["quizzes_completed"]
             
             gamification_agent = self.agents.get("GamificationAgent")
             gamification_result = gamification_agent.execute(
                 event_type="quiz_completed",
                 user_id=user_id,
                 quiz_score=percentage,
-                quizzes_completed=len(quiz_history) + 1,
+                quizzes_completed=quizzes_completed + 1,
                 current_points=user.points,
                 current_level=user.level
             ) if gamification_agent else {}
@@ -336,10 +339,9 @@ class Orchestrator:
                     "options": question.get("options", [])
                 })
             
-            responses_json = json.dumps(responses_list)
+            responses_json = json_utils.dumps(responses_list)
             
             # Save quiz attempt to history
-            from backend.db.models import QuizAttempt
             quiz_attempt = QuizAttempt(
                 attempt_id=str(uuid.uuid4()),
                 user_id=user_id,
@@ -408,9 +410,9 @@ class Orchestrator:
             if not user:
                 return {"status": "error", "error": "User not found"}
 
-            quiz_history = self.database.get_user_quiz_history(user_id)
-            avg_score = self.database.get_user_average_score(user_id)
-            gamification_stats = self.database.get_user_gamification_stats(user_id)
+            # Count and average come from one aggregate; only the rows shown are loaded
+            summary = self.database.get_user_quiz_summary(user_id)
+            recent_quizzes = self.database.get_user_quiz_history(user_id, limit=5)
 
             return {
                 "status": "success",
@@ -420,8 +422,8 @@ class Orchestrator:
                 "level": user.level,
                 "points": user.points,
                 "badges": user.badges.split(",") if user.badges else [],
-                "quizzes_completed": len(quiz_history),
-                "average_score": avg_score,
+                "quizzes_completed": summary["quizzes_completed"],
+                "average_score": summary["average_score"],
                 "recent_quizzes": [
                     {
                         "topic": q.topic,
@@ -429,7 +431,7 @@ class Orchestrator:
                         "score": q.score,
                         "percentage": q.score,  # q.score is already stored as percentage (0-100)
                         "date": q.created_at
-                    } for q in quiz_history[:5]
+                    } for q in recent_quizzes
                 ]
             }
 
@@ -465,8 +467,6 @@ class Orchestrator:
     def _log_trace(self, request_id: str, step: int, agent_name: str, 
                    status_msg: str, status: str, data: Dict = None, error: str = None):
         """Log a trace entry"""
-        from .db.models import TraceLog
-
         try:
             trace_id = f"{request_id}_{step}"
             log = TraceLog(
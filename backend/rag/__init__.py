@@ -28,6 +28,11 @@ class RAGManager:
         # Step 1: Ingest PDFs
         PDFIngestion.ingest_pdfs()
 
+        # Reuse the saved store unless a text file changed since it was written
+        saved_at = self.vector_store.saved_mtime_ns()
+        if saved_at and saved_at >= self.chunking_service.latest_source_mtime_ns() and self.vector_store.load():
+            return len(self.vector_store.metadata)
+
         # Step 2: Chunk documents
         chunks = self.chunking_service.process_all_documents()
 
@@ -46,6 +51,13 @@ class RAGManager:
         """
         return self.vector_store.search(query, top_k)
 
+    def search_batch(self, queries: list, top_k: int = 5) -> list:
+        """
+        Search for several queries in one pass
+        Returns one result list per query, in order
+        """
+        return self.vector_store.search_batch(queries, top_k)
+
     def get_context(self, topic: str) -> str:
         """
         Get context for a specific topic
@@ -7,9 +7,18 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from pathlib import Path
+import asyncio
+import hmac
 import json
+import logging
 import os
 
+from backend.db.models import User
+from backend.services import json_utils
+from backend.routers.topics_router import suggest_topics
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 # Path to store user credentials - use absolute path
@@ -37,10 +46,10 @@ def load_credentials() -> Dict[str, Any]:
     """Load credentials from file"""
     try:
         if CREDENTIALS_FILE.exists():
-            with open(CREDENTIALS_FILE, 'r') as f:
-                return json.load(f)
+            with open(CREDENTIALS_FILE, 'rb') as f:
+                return json_utils.loads(f.read())
     except Exception as e:
-        print(f"Error loading credentials: {e}")
+        logger.error(f"Error loading credentials: {e}")
     return {}
 
 
@@ -51,11 +60,24 @@ def save_credentials(credentials: Dict[str, Any]):
         with open(CREDENTIALS_FILE, 'w') as f:
             json.dump(credentials, f, indent=2)
     except Exception as e:
-        print(f"Error saving credentials: {e}")
+        logger.error(f"Error saving credentials: {e}")
+
+
+def passwords_match(stored: str, given: str) -> bool:
+    """Constant-time password check
 
+    Compares UTF-8 bytes, since hmac.compare_digest rejects str arguments
+    with non-ASCII characters.
+    """
+    return hmac.compare_digest(stored.encode("utf-8"), given.encode("utf-8"))
 
-def setup_auth_router(database):
-    """Setup authentication routes"""
+
+def setup_auth_router(database, topic_suggester=None):
+    """Setup authentication routes
+
+    When a topic_suggester is given, login responses also carry the user's
+    topic suggestions so the client needs no separate round trip for them.
+    """
 
     @router.post("/register")
     async def register_user(request: RegisterRequest) -> Dict[str, Any]:
@@ -72,11 +94,6 @@ def setup_auth_router(database):
         Returns: Success message and user_id
         """
         try:
-            from backend.db.models import User
-            import logging
-            import time
-            logger = logging.getLogger(__name__)
-            
             logger.info(f"Registering user: {request.name} with user_id: {request.user_id}")
             
             # Create new user in database FIRST
@@ -103,7 +120,8 @@ def setup_auth_router(database):
                     break
                 if attempt < max_retries - 1:
                     logger.warning(f"User verification failed on attempt {attempt + 1}/{max_retries}, retrying...")
-                    time.sleep(0.3)
+                    # Yield to the event loop instead of stalling every other request
+                    await asyncio.sleep(0.3)
             
             if not verify_user:
                 logger.error(f"User verification failed after {max_retries} attempts")
@@ -133,13 +151,12 @@ def setup_auth_router(database):
         except HTTPException:
             raise
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Registration error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    # Sync handler: runs in FastAPI's threadpool while login-time topic suggestion blocks
     @router.post("/login")
-    async def login_user(request: LoginRequest) -> Dict[str, Any]:
+    def login_user(request: LoginRequest) -> Dict[str, Any]:
         """
         Validate user login credentials
         
@@ -150,25 +167,33 @@ def setup_auth_router(database):
         Returns: User info if credentials valid
         """
         try:
-            credentials = load_credentials()
-            
-            username_lower = request.username.lower()
+            # Usernames are stored lowercased at registration
+            user_creds = load_credentials().get(request.username.lower())
             
-            if username_lower not in credentials:
+            if user_creds is None:
                 raise HTTPException(status_code=401, detail="Username not found")
             
-            user_creds = credentials[username_lower]
-            
-            if user_creds["password"] != request.password:
+            if not passwords_match(user_creds["password"], request.password):
                 raise HTTPException(status_code=401, detail="Incorrect password")
             
-            return {
+            response = {
                 "status": "success",
                 "user_id": user_creds["user_id"],
                 "name": user_creds["name"],
                 "age": user_creds["age"],
                 "message": f"Welcome {user_creds['name']}!"
             }
+            
+            # Topics are a convenience; a failure here must not block login
+            if topic_suggester is not None:
+                try:
+                    response["topics"], _ = suggest_topics(
+                        database, topic_suggester, user_creds["user_id"], user_creds["age"]
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not load topics at login: {e}")
+            
+            return response
 
         except HTTPException:
             raise
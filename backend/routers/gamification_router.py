@@ -3,15 +3,110 @@ Gamification Router
 Endpoints for user points, badges, levels, and leaderboard
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Header, Response
+from typing import List, Dict, Any, Optional
+import hashlib
+import logging
+
+from backend.services import json_utils
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/gamification", tags=["gamification"])
 
 
+def with_etag(payload: Dict[str, Any], response: Response, if_none_match: Optional[str]):
+    """
+    Tag a payload with a content hash ETag
+
+    Returns a bodiless 304 when the client already holds this version,
+    otherwise the payload with the ETag header set.
+    """
+    etag = '"' + hashlib.sha1(json_utils.dumps(payload).encode("utf-8")).hexdigest() + '"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return payload
+
+
 def setup_gamification_router(orchestrator, database):
     """Setup gamification routes"""
 
+    def user_stats_with_rank(user_id: str) -> Optional[Dict[str, Any]]:
+        """User stats plus the user's position in the points ranking, or None for an unknown user"""
+        result = orchestrator.get_user_stats(user_id)
+        
+        if result.get("status") == "error":
+            return None
+        
+        # Get user rank based on users.points (source of truth)
+        conn = database.get_connection()
+        cursor = conn.cursor()
+        
+        # Use ROW_NUMBER to get the user's actual position in the ranking
+        cursor.execute("""
+            WITH ranked_users AS (
+                SELECT 
+                    user_id,
+                    points,
+                    ROW_NUMBER() OVER (ORDER BY points DESC) as position
+                FROM users
+            )
+            SELECT position
+            FROM ranked_users
+            WHERE user_id = ?
+        """, (user_id,))
+        
+        position_result = cursor.fetchone()
+        rank = position_result["position"] if position_result else 1
+        
+        # Debug logging
+        logger.debug(f"User {user_id} - Query result: {position_result}, Rank: {rank}")
+        
+        conn.close()
+        
+        result["rank"] = rank
+        return result
+
+    def top_users(limit: int) -> List[Dict[str, Any]]:
+        """Top users by points with their quiz stats, ranked from 1"""
+        # Query database for top users with their stats
+        conn = database.get_connection()
+        cursor = conn.cursor()
+        
+        # Get top users by points with all their stats
+        cursor.execute("""
+            SELECT 
+                u.user_id,
+                u.name,
+                u.level,
+                u.points as total_points,
+                COUNT(DISTINCT qa.attempt_id) as quizzes_completed,
+                COALESCE(AVG(CAST(qa.score AS FLOAT)), 0) as avg_score
+            FROM users u
+            LEFT JOIN quiz_attempts qa ON u.user_id = qa.user_id
+            GROUP BY u.user_id, u.name, u.level, u.points
+            ORDER BY total_points DESC, quizzes_completed DESC
+            LIMIT ?
+        """, (limit,))
+        
+        rows = cursor.fetchall()
+        leaderboard = []
+        
+        for idx, row in enumerate(rows, 1):
+            leaderboard.append({
+                "rank": idx,
+                "user_id": row["user_id"],
+                "name": row["name"],
+                "level": row["level"],
+                "points": int(row["total_points"]),
+                "quizzes_completed": int(row["quizzes_completed"]),
+                "average_score": round(float(row["avg_score"]), 2) if row["avg_score"] else 0
+            })
+        
+        conn.close()
+        return leaderboard
+
     @router.get("/points/{user_id}")
     async def get_points(user_id: str) -> Dict[str, Any]:
         """
@@ -35,104 +130,71 @@ def setup_gamification_router(orchestrator, database):
                 "average_score": result.get("average_score", 0)
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    # Sync handlers: run in FastAPI's threadpool while the SQLite queries block
     @router.get("/stats/{user_id}")
-    async def get_stats(user_id: str) -> Dict[str, Any]:
+    def get_stats(user_id: str) -> Dict[str, Any]:
         """
         Get comprehensive user statistics
         
         Returns: Complete profile, achievements, progress with rank
         """
         try:
-            result = orchestrator.get_user_stats(user_id)
-            
-            if result.get("status") == "error":
+            stats = user_stats_with_rank(user_id)
+            if stats is None:
                 raise HTTPException(status_code=404, detail="User not found")
-            
-            # Get user rank based on users.points (source of truth)
-            conn = database.get_connection()
-            cursor = conn.cursor()
-            
-            # Use ROW_NUMBER to get the user's actual position in the ranking
-            cursor.execute("""
-                WITH ranked_users AS (
-                    SELECT 
-                        user_id,
-                        points,
-                        ROW_NUMBER() OVER (ORDER BY points DESC) as position
-                    FROM users
-                )
-                SELECT position
-                FROM ranked_users
-                WHERE user_id = ?
-            """, (user_id,))
-            
-            position_result = cursor.fetchone()
-            rank = position_result["position"] if position_result else 1
-            
-            # Debug logging
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"DEBUG: User {user_id} - Query result: {position_result}, Rank: {rank}")
-            
-            conn.close()
-            
-            result["rank"] = rank
-            return result
+            return stats
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.get("/leaderboard")
-    async def get_leaderboard(limit: int = 10) -> Dict[str, Any]:
+    def get_leaderboard(
+        response: Response,
+        limit: int = 10,
+        if_none_match: Optional[str] = Header(None)
+    ) -> Dict[str, Any]:
         """
         Get top users by points (leaderboard)
         
-        Returns: Top users ranked by points with stats
+        Returns: Top users ranked by points with stats (304 if unchanged)
         """
         try:
-            # Query database for top users with their stats
-            conn = database.get_connection()
-            cursor = conn.cursor()
-            
-            # Get top users by points with all their stats
-            cursor.execute("""
-                SELECT 
-                    u.user_id,
-                    u.name,
-                    u.level,
-                    u.points as total_points,
-                    COUNT(DISTINCT qa.attempt_id) as quizzes_completed,
-                    COALESCE(AVG(CAST(qa.score AS FLOAT)), 0) as avg_score
-                FROM users u
-                LEFT JOIN quiz_attempts qa ON u.user_id = qa.user_id
-                GROUP BY u.user_id, u.name, u.level, u.points
-                ORDER BY total_points DESC, quizzes_completed DESC
-                LIMIT ?
-            """, (limit,))
-            
-            rows = cursor.fetchall()
-            leaderboard = []
-            
-            for idx, row in enumerate(rows, 1):
-                leaderboard.append({
-                    "rank": idx,
-                    "user_id": row["user_id"],
-                    "name": row["name"],
-                    "level": row["level"],
-                    "points": int(row["total_points"]),
-                    "quizzes_completed": int(row["quizzes_completed"]),
-                    "average_score": round(float(row["avg_score"]), 2) if row["avg_score"] else 0
-                })
-            
-            conn.close()
-            
-            return {
+            payload = {
+                "status": "success",
+                "leaderboard": top_users(limit)
+            }
+            return with_etag(payload, response, if_none_match)
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.get("/dashboard/{user_id}")
+    def get_dashboard(
+        user_id: str,
+        response: Response,
+        limit: int = 10,
+        if_none_match: Optional[str] = Header(None)
+    ) -> Dict[str, Any]:
+        """
+        Get the leaderboard and one user's stats in a single call
+        
+        Returns: Same payloads as /leaderboard and /stats/{user_id} (304 if unchanged);
+        user_stats is None for an unknown user, so the leaderboard still renders
+        """
+        try:
+            payload = {
                 "status": "success",
-                "leaderboard": leaderboard
+                "leaderboard": top_users(limit),
+                "user_stats": user_stats_with_rank(user_id)
             }
+            return with_etag(payload, response, if_none_match)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
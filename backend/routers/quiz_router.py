@@ -19,8 +19,10 @@ router = APIRouter(prefix="/api/quiz", tags=["quiz"])
 def setup_quiz_router(orchestrator):
     """Setup quiz routes with orchestrator dependency"""
 
+    # Plain def so FastAPI runs it in its threadpool; the blocking GPT-4o call
+    # would otherwise stall every other request on the event loop
     @router.post("/generate")
-    async def generate_quiz(request: QuizGenerateRequest) -> Dict[str, Any]:
+    def generate_quiz(request: QuizGenerateRequest) -> Dict[str, Any]:
         """
         Generate a personalized quiz for a user
         
@@ -6,7 +6,6 @@ Endpoints for submitting and evaluating quiz answers
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,8 +25,9 @@ class QuizSubmission(BaseModel):
 def setup_submit_router(orchestrator, database, topic_suggester=None):
     """Setup submit routes with orchestrator and database dependency"""
 
+    # Sync handler: runs in FastAPI's threadpool while the GPT-4o analysis blocks
     @router.post("/answers")
-    async def submit_answers(submission: QuizSubmission) -> Dict[str, Any]:
+    def submit_answers(submission: QuizSubmission) -> Dict[str, Any]:
         """
         Submit quiz answers for evaluation
         
@@ -98,12 +98,6 @@ def setup_submit_router(orchestrator, database, topic_suggester=None):
                 except Exception as e:
                     logger.warning(f"Could not enhance feedback with GPT-4o: {e}")
             
-            # Store responses
-            responses_json = json.dumps({
-                "questions": [{"q": q.get("question", ""), "a": submission.answers[i] if i < len(submission.answers) else -1} 
-                             for i, q in enumerate(submission.questions)]
-            })
-            
             # Update result with recommendations
             result["next_difficulty"] = next_difficulty
             result["feedback_message"] = feedback
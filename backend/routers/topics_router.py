@@ -6,7 +6,10 @@ Topics are extracted from curriculum content for the appropriate class level
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/topics", tags=["topics"])
 
@@ -16,11 +19,23 @@ class TopicsRequest(BaseModel):
     age: int
 
 
+def suggest_topics(database, topic_suggester, user_id: str, age: int) -> Tuple[List[str], List[str]]:
+    """
+    Age-based topic suggestions, excluding topics the user has already covered
+    
+    Returns:
+        (suggested topics, topics the user has already covered)
+    """
+    previous_topics = database.get_user_topics(user_id)
+    return topic_suggester.get_topics_for_age(age, previous_topics), previous_topics
+
+
 def setup_topics_router(database, topic_suggester):
     """Setup topics routes with topic_suggester dependency"""
 
+    # Sync handler: runs in FastAPI's threadpool while topic suggestion blocks
     @router.post("/suggestions")
-    async def get_topic_suggestions(request: TopicsRequest) -> Dict[str, Any]:
+    def get_topic_suggestions(request: TopicsRequest) -> Dict[str, Any]:
         """
         Get topic suggestions based on user age
         Topics are extracted from the educational PDF for the appropriate class level
@@ -32,14 +47,10 @@ def setup_topics_router(database, topic_suggester):
         4. Return top 5 topics
         """
         try:
-            # Get user's previous topics
-            previous_attempts = database.get_user_quiz_attempts(request.user_id)
-            previous_topics = list(set([attempt.topic for attempt in previous_attempts]))
-            
-            # Get suggestions from PDF-based topic suggester
-            topics = topic_suggester.get_topics_for_age(request.age, previous_topics)
+            # Get suggestions from PDF-based topic suggester, minus the user's previous topics
+            topics, previous_topics = suggest_topics(database, topic_suggester, request.user_id, request.age)
             
-            print(f"[TopicsRouter] Returned topics for age {request.age}: {topics}")
+            logger.debug(f"Returned topics for age {request.age}: {topics}")
             
             # Get class information
             class_info = topic_suggester.pdf_extractor.get_class_info(request.age)
@@ -56,7 +67,7 @@ def setup_topics_router(database, topic_suggester):
             }
 
         except Exception as e:
-            print(f"[TopicsRouter] ERROR: {e}")
+            logger.error(f"Error getting topic suggestions: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
     return router
@@ -4,13 +4,40 @@ Splits documents into semantic chunks for embedding
 """
 
 import logging
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 TEXT_DIR = Path(__file__).parent.parent.parent / "data" / "text"
 
+# File reads release the GIL, so a few threads overlap their disk latency
+MAX_READ_WORKERS = 8
+
+
+def _text_file_entries() -> List[os.DirEntry]:
+    """
+    The .txt files in TEXT_DIR, in name order
+    A suffix check on scandir names skips glob's pattern matching, and entries cache their stat data
+    """
+    with os.scandir(TEXT_DIR) as entries:
+        return sorted(
+            (entry for entry in entries if entry.name.endswith(".txt") and entry.is_file()),
+            key=lambda entry: entry.name
+        )
+
+
+def _read_text_file(text_file: Path) -> Optional[str]:
+    """Read one text file, logging and returning None on failure"""
+    try:
+        with open(text_file, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception as e:
+        logger.error(f"Error reading {text_file.name}: {e}")
+        return None
+
 
 class ChunkingService:
     """Handle text chunking for RAG"""
@@ -90,6 +117,15 @@ class ChunkingService:
 
         return [c for c in chunks if len(c) > 30]
 
+    def latest_source_mtime_ns(self) -> int:
+        """
+        Newest modification time among the text files (and the folder itself, so deletions count)
+        """
+        try:
+            return max([TEXT_DIR.stat().st_mtime_ns] + [entry.stat().st_mtime_ns for entry in _text_file_entries()])
+        except OSError:
+            return 0
+
     def process_all_documents(self) -> List[dict]:
         """
         Process all text documents and return chunks with metadata
@@ -98,17 +134,20 @@ class ChunkingService:
         
         TEXT_DIR.mkdir(parents=True, exist_ok=True)
         
-        text_files = list(TEXT_DIR.glob("*.txt"))
+        text_files = [Path(entry.path) for entry in _text_file_entries()]
         
         if not text_files:
             logger.warning("No text files found for chunking")
             return []
 
-        for text_file in text_files:
-            try:
-                with open(text_file, "r", encoding="utf-8") as f:
-                    text = f.read()
+        # Read every file concurrently, then chunk in the original order
+        with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(text_files))) as executor:
+            texts = list(executor.map(_read_text_file, text_files))
 
+        for text_file, text in zip(text_files, texts):
+            if text is None:
+                continue
+            try:
                 # Use section-based chunking for educational content
                 chunks = self.chunk_by_sections(text)
 
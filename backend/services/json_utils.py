@@ -0,0 +1,48 @@
+"""
+JSON Utilities
+Fast JSON (de)serialization using orjson when installed, stdlib json otherwise
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception regardless of which backend is active
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Any) -> Any:
+    """
+    Parse JSON from str or bytes
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Parsed Python object
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize an object to a compact JSON string
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        JSON string
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
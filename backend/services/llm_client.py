@@ -0,0 +1,52 @@
+"""
+LLM Client
+Process-wide Azure OpenAI (GPT-4o) client shared by the topic and question services,
+so every GPT-4o request goes through one keep-alive connection pool
+"""
+
+import logging
+import os
+
+try:
+    from openai import AzureOpenAI
+    AZURE_OPENAI_AVAILABLE = True
+except ImportError:
+    AZURE_OPENAI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Configure Azure OpenAI (GPT-4o) as PRIMARY LLM
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
+AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME", "gpt-4o")
+
+logger.debug(f"OPENAI_API_KEY={'SET' if OPENAI_API_KEY else 'NOT SET'}")
+logger.debug(f"AZURE_OPENAI_ENDPOINT={'SET' if AZURE_OPENAI_ENDPOINT else 'NOT SET'}")
+logger.debug(f"AZURE_DEPLOYMENT_NAME={AZURE_DEPLOYMENT_NAME}")
+logger.debug(f"AZURE_OPENAI_AVAILABLE={AZURE_OPENAI_AVAILABLE}")
+
+azure_openai_client = None
+if OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_AVAILABLE:
+    try:
+        azure_openai_client = AzureOpenAI(
+            api_key=OPENAI_API_KEY,
+            api_version="2024-02-15-preview",
+            azure_endpoint=AZURE_OPENAI_ENDPOINT
+        )
+        logger.info("✅ Azure OpenAI (GPT-4o) configured as PRIMARY LLM")
+    except Exception as e:
+        logger.warning(f"Failed to configure Azure OpenAI: {e}")
+        azure_openai_client = None
+else:
+    missing_vars = []
+    if not OPENAI_API_KEY:
+        missing_vars.append("OPENAI_API_KEY")
+    if not AZURE_OPENAI_ENDPOINT:
+        missing_vars.append("AZURE_OPENAI_ENDPOINT")
+    if not AZURE_OPENAI_AVAILABLE:
+        missing_vars.append("openai library")
+    
+    vars_str = ", ".join(missing_vars)
+    logger.warning(f"⚠️  Azure OpenAI (GPT-4o) not available. Missing: {vars_str}")
+    logger.warning("📖 See AZURE_OPENAI_SETUP.md for configuration instructions")
+    logger.info("ℹ️  Will use fallback PDF-based topic and question extraction")
@@ -4,12 +4,16 @@ Extracts topics and content from educational PDFs based on user age/class
 Maps age to appropriate class PDF and extracts learning content
 """
 
+import hashlib
 import logging
 import os
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import json
 import re
+import tempfile
 
 try:
     import PyPDF2
@@ -32,6 +36,25 @@ AGE_TO_CLASS = {
     15: "Class_10th",
 }
 
+# Topic keywords used for content matching (words of 3+ characters)
+TOPIC_WORD_PATTERN = re.compile(r'\S{3,}')
+
+# Extracted PDF text by path, shared by every extractor instance so each PDF
+# is parsed once per process rather than once per service that reads it
+PDF_TEXT_CACHE: Dict[Path, str] = {}
+
+# Ranked topics per age and topic excerpts per (class, topic) are pure functions
+# of that text, so they are likewise computed once per process. Topic excerpts are
+# an LRU bounded by MAX_TOPIC_CONTENT_ENTRIES; its lock covers the threadpool handlers
+TOPICS_BY_AGE_CACHE: Dict[int, List[str]] = {}
+TOPIC_CONTENT_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+TOPIC_CONTENT_LOCK = threading.Lock()
+MAX_TOPIC_CONTENT_ENTRIES = 256
+
+# Extracted text also persists across restarts, keyed by PDF path, mtime and size
+# so an edited or replaced PDF is parsed again
+PDF_TEXT_DISK_CACHE_DIR = Path(__file__).parent.parent.parent / "data" / "pdf_text_cache"
+
 # Age ranges for each class
 CLASS_AGE_RANGES = {
     "Class_6th": (11, 12),
@@ -42,12 +65,20 @@ CLASS_AGE_RANGES = {
 }
 
 
+def clear_pdf_caches():
+    """Drop all in-process text and topic caches, e.g. after the PDFs were re-ingested"""
+    PDF_TEXT_CACHE.clear()
+    TOPICS_BY_AGE_CACHE.clear()
+    with TOPIC_CONTENT_LOCK:
+        TOPIC_CONTENT_CACHE.clear()
+
+
 class PDFContentExtractor:
     """Extracts topics and content from educational PDFs"""
     
     def __init__(self):
         """Initialize PDF extractor"""
-        self.pdf_cache = {}  # Cache extracted PDF content
+        self.pdf_cache = PDF_TEXT_CACHE  # Cache extracted PDF content
         logger.info("PDFContentExtractor initialized")
     
     def get_class_for_age(self, age: int) -> str:
@@ -90,20 +121,87 @@ class PDFContentExtractor:
         Returns:
             Extracted text content
         """
+        cache_path = self._disk_cache_path(pdf_path)
+        if cache_path and cache_path.exists():
+            try:
+                return cache_path.read_text(encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Could not read cached PDF text: {e}")
+        
+        content = self._parse_pdf(pdf_path)
+        if content and cache_path:
+            self._write_disk_cache(cache_path, content)
+        return content
+    
+    def get_pdf_text(self, pdf_path: Path) -> str:
+        """
+        Get a PDF's extracted text, parsing it at most once per process
+        Empty results are cached too, so an unreadable PDF is not re-parsed on every request
+        
+        Args:
+            pdf_path: Path to PDF file
+        
+        Returns:
+            Extracted text content
+        """
+        content = self.pdf_cache.get(pdf_path)
+        if content is None:
+            content = self.extract_text_from_pdf(pdf_path)
+            self.pdf_cache[pdf_path] = content
+        return content
+    
+    def _disk_cache_path(self, pdf_path: Path) -> Optional[Path]:
+        """
+        On-disk cache file for a PDF's extracted text, or None if the PDF can't be stat'ed
+        Named <path key>-<version key>.txt, so older versions of the same PDF can be found
+        """
+        try:
+            stat = pdf_path.stat()
+        except OSError:
+            return None
+        path_key = hashlib.sha1(str(pdf_path).encode("utf-8")).hexdigest()[:16]
+        version_key = hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")).hexdigest()[:16]
+        return PDF_TEXT_DISK_CACHE_DIR / f"{path_key}-{version_key}.txt"
+    
+    def _write_disk_cache(self, cache_path: Path, content: str):
+        """
+        Atomically store extracted text, then drop cached text of older versions of the PDF
+        
+        The text goes to a temp file in the cache directory and is renamed into place,
+        so concurrent readers and a crash mid-write never see a truncated cache file.
+        """
+        path_key = cache_path.stem.split("-", 1)[0]
+        try:
+            PDF_TEXT_DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=PDF_TEXT_DISK_CACHE_DIR, prefix=f"{path_key}-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                    tmp_file.write(content)
+                os.replace(tmp_name, cache_path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+            
+            for stale_path in PDF_TEXT_DISK_CACHE_DIR.glob(f"{path_key}-*.txt"):
+                if stale_path != cache_path:
+                    stale_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not cache PDF text: {e}")
+    
+    def _parse_pdf(self, pdf_path: Path) -> str:
+        """Extract all text from a PDF file with PyPDF2"""
         try:
             if not PyPDF2:
                 logger.warning("PyPDF2 not installed. Cannot extract PDF content.")
                 return ""
             
-            text_content = ""
             with open(pdf_path, 'rb') as pdf_file:
                 pdf_reader = PyPDF2.PdfReader(pdf_file)
                 num_pages = len(pdf_reader.pages)
                 logger.info(f"Extracting text from {num_pages} pages of {pdf_path.name}")
                 
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    text_content += page.extract_text()
+                # Join once rather than growing a string page by page
+                text_content = "".join(page.extract_text() for page in pdf_reader.pages)
             
             return text_content
         except Exception as e:
@@ -260,6 +358,10 @@ class PDFContentExtractor:
         Returns:
             List of cleaned, ranked topics from the appropriate PDF
         """
+        cached_topics = TOPICS_BY_AGE_CACHE.get(age)
+        if cached_topics is not None:
+            return list(cached_topics)
+        
         try:
             # Map age to class
             class_name = self.get_class_for_age(age)
@@ -269,18 +371,10 @@ class PDFContentExtractor:
                 logger.warning(f"PDF not found for class {class_name}")
                 return []
             
-            # Check cache first
-            if pdf_path in self.pdf_cache:
-                content = self.pdf_cache[pdf_path]
-            else:
-                # Extract text from PDF
-                content = self.extract_text_from_pdf(pdf_path)
-                if not content:
-                    logger.warning(f"No content extracted from {pdf_path}")
-                    return []
-                
-                # Cache the content
-                self.pdf_cache[pdf_path] = content
+            content = self.get_pdf_text(pdf_path)
+            if not content:
+                logger.warning(f"No content extracted from {pdf_path}")
+                return []
             
             # Extract topics from content
             topics = self.extract_topics_from_content(content)
@@ -294,7 +388,9 @@ class PDFContentExtractor:
             ranked_topics = selector.select_best_topics(cleaned_topics, age, count=10)
             
             logger.info(f"Retrieved {len(ranked_topics)} cleaned/ranked topics for age {age} from {class_name}")
-            return ranked_topics
+            if ranked_topics:
+                TOPICS_BY_AGE_CACHE[age] = ranked_topics
+            return list(ranked_topics)
             
         except Exception as e:
             logger.error(f"Error getting topics for age {age}: {e}")
@@ -312,6 +408,24 @@ class PDFContentExtractor:
         Returns:
             Relevant content from PDF (up to 4000 chars)
         """
+        key = (self.get_class_for_age(age), topic)
+        with TOPIC_CONTENT_LOCK:
+            content = TOPIC_CONTENT_CACHE.get(key)
+            if content is not None:
+                TOPIC_CONTENT_CACHE.move_to_end(key)
+                return content
+        
+        content = self._search_content_for_topic(age, topic)
+        if content:
+            with TOPIC_CONTENT_LOCK:
+                TOPIC_CONTENT_CACHE[key] = content
+                # Evict the least recently used excerpt once the cache is full
+                if len(TOPIC_CONTENT_CACHE) > MAX_TOPIC_CONTENT_ENTRIES:
+                    TOPIC_CONTENT_CACHE.popitem(last=False)
+        return content
+    
+    def _search_content_for_topic(self, age: int, topic: str) -> str:
+        """Scan the class PDF text for sections about a topic (uncached)"""
         try:
             class_name = self.get_class_for_age(age)
             pdf_path = self.get_pdf_path(class_name)
@@ -320,19 +434,14 @@ class PDFContentExtractor:
                 logger.warning(f"No PDF path for age {age}")
                 return ""
             
-            # Get or extract content
-            if pdf_path in self.pdf_cache:
-                content = self.pdf_cache[pdf_path]
-            else:
-                content = self.extract_text_from_pdf(pdf_path)
-                self.pdf_cache[pdf_path] = content
+            content = self.get_pdf_text(pdf_path)
             
             if not content:
                 logger.warning(f"No content in PDF for age {age}")
                 return ""
             
             # Extract keywords from topic for better matching
-            topic_words = [word.lower().strip() for word in topic.split() if len(word.strip()) > 2]
+            topic_words = TOPIC_WORD_PATTERN.findall(topic.lower())
             
             # Split content into lines and find sections related to the topic
             lines = content.split('\n')
@@ -445,15 +554,7 @@ class PDFContentExtractor:
             if not pdf_path:
                 return ""
             
-            # Check cache first
-            if pdf_path in self.pdf_cache:
-                return self.pdf_cache[pdf_path]
-            
-            # Extract and cache
-            content = self.extract_text_from_pdf(pdf_path)
-            self.pdf_cache[pdf_path] = content
-            
-            return content
+            return self.get_pdf_text(pdf_path)
             
         except Exception as e:
             logger.error(f"Error getting class content: {e}")
@@ -476,5 +577,5 @@ class PDFContentExtractor:
             "class": class_name,
             "age_range": CLASS_AGE_RANGES.get(class_name, (0, 0)),
             "pdf_path": str(pdf_path) if pdf_path else None,
-            "pdf_exists": pdf_path.exists() if pdf_path else False
+            "pdf_exists": pdf_path is not None  # get_pdf_path only returns existing files
         }
@@ -9,6 +9,8 @@ from pathlib import Path
 from typing import List
 import shutil
 
+from .pdf_content_extractor import clear_pdf_caches
+
 logger = logging.getLogger(__name__)
 
 # Source PDF location (actual financial education PDFs)
@@ -42,7 +44,9 @@ class PDFIngestion:
                 return [str(TEXT_DIR / "sample_financial_content.txt")]
 
             # Get all PDF files from source
-            pdf_files = list(CONTENT_PDF_DIR.glob("*.pdf"))
+            with os.scandir(CONTENT_PDF_DIR) as entries:
+                pdf_files = [Path(entry.path) for entry in entries
+                             if entry.name.endswith(".pdf") and entry.is_file()]
             
             if not pdf_files:
                 logger.warning(f"No PDF files found in {CONTENT_PDF_DIR}")
@@ -50,16 +54,25 @@ class PDFIngestion:
                 return [str(TEXT_DIR / "sample_financial_content.txt")]
 
             logger.info(f"Found {len(pdf_files)} PDF files to ingest")
+            pdfs_changed = False
 
             for pdf_file in pdf_files:
                 try:
-                    # Copy PDF to project directory
+                    # Copy PDF to project directory (copy2 keeps mtime, so unchanged files are skipped)
                     dest_pdf = PDF_DIR / pdf_file.name
-                    shutil.copy2(pdf_file, dest_pdf)
-                    logger.info(f"Copied {pdf_file.name} to {dest_pdf}")
+                    if not PDFIngestion._is_up_to_date(dest_pdf, pdf_file):
+                        shutil.copy2(pdf_file, dest_pdf)
+                        pdfs_changed = True
+                        logger.info(f"Copied {pdf_file.name} to {dest_pdf}")
                     
-                    # Extract text from PDF
+                    # Reuse text extracted on a previous run unless the PDF has changed since
                     text_file = TEXT_DIR / f"{pdf_file.stem}.txt"
+                    if PDFIngestion._is_newer(text_file, dest_pdf):
+                        processed_files.append(str(text_file))
+                        logger.info(f"Using previously extracted text for {pdf_file.name}")
+                        continue
+                    
+                    # Extract text from PDF
                     extracted_text = PDFIngestion._extract_text_from_pdf(str(dest_pdf))
                     
                     if extracted_text:
@@ -73,6 +86,10 @@ class PDFIngestion:
                 except Exception as e:
                     logger.error(f"Error processing {pdf_file.name}: {e}")
 
+            # Text and topics cached in this process came from the old PDFs
+            if pdfs_changed:
+                clear_pdf_caches()
+
             if not processed_files:
                 logger.warning("No PDFs successfully processed, creating sample content")
                 PDFIngestion._create_sample_content()
@@ -85,6 +102,24 @@ class PDFIngestion:
             PDFIngestion._create_sample_content()
             return [str(TEXT_DIR / "sample_financial_content.txt")]
 
+    @staticmethod
+    def _is_up_to_date(copy: Path, source: Path) -> bool:
+        """True if copy exists with the same size and mtime as source"""
+        try:
+            copy_stat, source_stat = copy.stat(), source.stat()
+        except OSError:
+            return False
+        return (copy_stat.st_size, copy_stat.st_mtime_ns) == (source_stat.st_size, source_stat.st_mtime_ns)
+
+    @staticmethod
+    def _is_newer(derived: Path, source: Path) -> bool:
+        """True if derived exists, is non-empty and was written after source last changed"""
+        try:
+            derived_stat = derived.stat()
+            return derived_stat.st_size > 0 and derived_stat.st_mtime_ns >= source.stat().st_mtime_ns
+        except OSError:
+            return False
+
     @staticmethod
     def _extract_text_from_pdf(pdf_path: str) -> str:
         """
@@ -94,16 +129,16 @@ class PDFIngestion:
         try:
             import PyPDF2
             
-            text = ""
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 num_pages = len(pdf_reader.pages)
                 logger.info(f"Extracting from PDF with {num_pages} pages")
                 
-                for page_num in range(min(num_pages, 50)):  # Limit to first 50 pages
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-                    text += "\n\n"
+                # Join once rather than growing a string page by page
+                text = "".join(
+                    page.extract_text() + "\n\n"
+                    for page in pdf_reader.pages[:50]  # Limit to first 50 pages
+                )
             
             return text if text.strip() else None
             
@@ -121,14 +156,14 @@ class PDFIngestion:
             # Try pdfplumber if available
             import pdfplumber
             
-            text = ""
+            page_texts = []
             with pdfplumber.open(pdf_path) as pdf:
-                for i, page in enumerate(pdf.pages[:50]):  # Limit to first 50 pages
+                for page in pdf.pages[:50]:  # Limit to first 50 pages
                     try:
-                        text += page.extract_text()
-                        text += "\n\n"
+                        page_texts.append(page.extract_text() + "\n\n")
                     except:
                         continue
+            text = "".join(page_texts)
             
             return text if text.strip() else None
             
@@ -308,6 +343,13 @@ KEY TAKEAWAYS
         text_file = TEXT_DIR / "sample_financial_content.txt"
         text_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # Leave an identical file untouched so its mtime doesn't force a vector store rebuild
+        try:
+            if text_file.read_text() == sample_content:
+                return
+        except OSError:
+            pass
+        
         with open(text_file, "w") as f:
             f.write(sample_content)
         
@@ -6,66 +6,163 @@ Ensures questions are directly related to PDF content and topics
 """
 
 import logging
-import os
 from typing import List, Dict, Any, Optional
-import json
 import time
 
 try:
-    from openai import AzureOpenAI
-    AZURE_OPENAI_AVAILABLE = True
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
 except ImportError:
-    AZURE_OPENAI_AVAILABLE = False
+    TIKTOKEN_AVAILABLE = False
 
 from .pdf_content_extractor import PDFContentExtractor
+from .llm_client import AZURE_DEPLOYMENT_NAME, azure_openai_client
+from . import json_utils
 
 logger = logging.getLogger(__name__)
 
-# Configure Azure OpenAI (GPT-4o) as PRIMARY LLM
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
-AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME", "gpt-4o")
+# Curriculum budget per prompt: tokens when tiktoken is available, characters otherwise
+MAX_CONTENT_TOKENS = 800
+MAX_CONTENT_CHARS = 3000
 
-logger.info(f"DEBUG: OPENAI_API_KEY={'SET' if OPENAI_API_KEY else 'NOT SET'}")
-logger.info(f"DEBUG: AZURE_OPENAI_ENDPOINT={'SET' if AZURE_OPENAI_ENDPOINT else 'NOT SET'}")
-logger.info(f"DEBUG: AZURE_DEPLOYMENT_NAME={AZURE_DEPLOYMENT_NAME}")
-logger.info(f"DEBUG: AZURE_OPENAI_AVAILABLE={AZURE_OPENAI_AVAILABLE}")
+# Static instructions and JSON schema shared by every question request. Sent as the
+# system message so the identical prefix can be served from the provider's prompt cache;
+# only the per-request student profile, curriculum and topic go in the user message.
+QUESTION_SYSTEM_PROMPT = """You are an expert financial education teacher creating quiz questions.
+Generate questions ONLY from the provided curriculum content.
 
-azure_openai_client = None
-if OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_AVAILABLE:
-    try:
-        azure_openai_client = AzureOpenAI(
-            api_key=OPENAI_API_KEY,
-            api_version="2024-02-15-preview",
-            azure_endpoint=AZURE_OPENAI_ENDPOINT
-        )
-        logger.info("✅ Azure OpenAI (GPT-4o) configured as PRIMARY LLM")
-    except Exception as e:
-        logger.warning(f"Failed to configure Azure OpenAI: {e}")
-        azure_openai_client = None
-else:
-    missing_vars = []
-    if not OPENAI_API_KEY:
-        missing_vars.append("OPENAI_API_KEY")
-    if not AZURE_OPENAI_ENDPOINT:
-        missing_vars.append("AZURE_OPENAI_ENDPOINT")
-    if not AZURE_OPENAI_AVAILABLE:
-        missing_vars.append("openai library")
+CRITICAL REQUIREMENTS:
+1. ALL questions MUST be answerable ONLY from the provided curriculum content
+2. Do NOT create questions about information not in the curriculum
+3. Do NOT use external knowledge or make up facts
+4. Every question must directly test understanding of the curriculum material
+5. IMPORTANT: Every answer option MUST be COMPLETE and FULL sentences, NOT truncated
+6. Every answer option must be plausible but only ONE correct
+7. Vary the position of correct answers (use positions 0, 1, 2, and 3)
+8. Do NOT repeat or duplicate options across different questions
+9. Make options distinct and clearly different from each other
+
+For each question:
+1. Create a clear, unambiguous question based directly on the curriculum
+2. Provide 4 COMPLETE and DISTINCT options
+3. Mark the correct answer position (0-3)
+4. Provide a detailed explanation citing the curriculum
+5. Ensure questions vary in difficulty and topic coverage
+
+Return ONLY valid JSON:
+
+{
+    "questions": [
+        {
+            "question_id": "q_1",
+            "question": "Question text?",
+            "type": "multiple_choice",
+            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "correct_answer": 0,
+            "explanation": "Explanation with curriculum reference"
+        }
+    ]
+}"""
+
+
+class QuestionStreamParser:
+    """
+    Incrementally extracts complete question objects from a (streamed) JSON response
     
-    vars_str = ", ".join(missing_vars)
-    logger.warning(f"⚠️  Azure OpenAI (GPT-4o) not available. Missing: {vars_str}")
-    logger.warning(f"📖 See AZURE_OPENAI_SETUP.md for configuration instructions")
-    logger.info("ℹ️  Will use fallback PDF-based question extraction")
+    Walks the "questions" array tracking string and brace state, and parses each
+    balanced top-level object as soon as its closing brace arrives. Anything after
+    the last complete object (e.g. a response truncated at max_tokens) is ignored.
+    """
+    
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.in_array = False
+        self.done = False
+        self.depth = 0
+        self.obj_start = -1
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Add response text and return the question objects completed by it
+        
+        Args:
+            text: Next piece of the response
+        
+        Returns:
+            List of newly completed question dictionaries
+        """
+        self.buffer += text
+        completed = []
+        
+        if self.done:
+            return completed
+        
+        if not self.in_array:
+            key_pos = self.buffer.find('"questions"')
+            if key_pos == -1:
+                return completed
+            array_start = self.buffer.find('[', key_pos)
+            if array_start == -1:
+                return completed
+            self.in_array = True
+            self.pos = array_start + 1
+        
+        buffer = self.buffer
+        for pos in range(self.pos, len(buffer)):
+            char = buffer[pos]
+            
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+            
+            if char == '"':
+                self.in_string = True
+            elif char == '{':
+                if self.depth == 0:
+                    self.obj_start = pos
+                self.depth += 1
+            elif char == '}' and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        question = json_utils.loads(buffer[self.obj_start:pos + 1])
+                        if isinstance(question, dict):
+                            completed.append(question)
+                    except json_utils.JSONDecodeError:
+                        logger.debug(f"Skipping unparseable question object at char {self.obj_start}")
+            elif char == ']' and self.depth == 0:
+                self.done = True
+                break
+        
+        self.pos = len(buffer)
+        return completed
 
 
 class PDFBasedQuestionGenerator:
     """Generates questions based on PDF content"""
     
-    def __init__(self):
-        """Initialize question generator"""
-        self.pdf_extractor = PDFContentExtractor()
+    def __init__(self, pdf_extractor: PDFContentExtractor = None):
+        """Initialize question generator, optionally sharing an existing PDF extractor"""
+        self.pdf_extractor = pdf_extractor or PDFContentExtractor()
         self.azure_openai_client = azure_openai_client
         
+        # Tokenizer for budgeting curriculum content by tokens rather than characters
+        self.tokenizer = self._load_tokenizer()
+        
+        # Age buckets are fixed, so resolve prompt context once per supported age
+        self._age_table = {
+            age: (self._get_age_context(age), self._get_vocabulary_level(age))
+            for age in range(5, 21)
+        }
+        
         if self.azure_openai_client:
             logger.info("✅ PDF-Based Question Generator initialized with Azure OpenAI GPT-4o")
         else:
@@ -98,14 +195,10 @@ class PDFBasedQuestionGenerator:
             
             # Step 1: Get PDF content for the topic
             logger.info(f"📚 Retrieving PDF content for topic: {topic}")
-            pdf_content = self.pdf_extractor.get_content_for_topic(age, topic)
-            
-            if not pdf_content or len(pdf_content.strip()) < 100:
-                logger.warning(f"⚠️  Limited PDF content found for topic: {topic}, fetching full class content")
-                pdf_content = self.pdf_extractor.get_full_class_content(age)
-                if not pdf_content or len(pdf_content.strip()) < 100:
-                    logger.error(f"❌ No sufficient PDF content available for age {age}")
-                    return []
+            pdf_content = self._get_pdf_content(age, topic)
+            if not pdf_content:
+                logger.error(f"❌ No sufficient PDF content available for age {age}")
+                return []
             
             logger.info(f"✅ Retrieved {len(pdf_content)} characters of PDF content")
             
@@ -153,6 +246,68 @@ class PDFBasedQuestionGenerator:
             logger.error(f"❌ Error generating questions for topic {topic}: {e}", exc_info=True)
             return []
     
+    def _load_tokenizer(self):
+        """Load the tokenizer for the configured deployment, or None if unavailable"""
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        try:
+            return tiktoken.encoding_for_model(AZURE_DEPLOYMENT_NAME)
+        except KeyError:
+            # Custom deployment names are not known to tiktoken - GPT-4o uses o200k_base
+            try:
+                return tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer, truncating by characters: {e}")
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer, truncating by characters: {e}")
+        return None
+    
+    def _truncate_content(self, content: str) -> str:
+        """
+        Truncate curriculum content to the prompt budget
+        
+        Args:
+            content: PDF content to truncate
+        
+        Returns:
+            Content cut to MAX_CONTENT_TOKENS tokens (or MAX_CONTENT_CHARS characters
+            when no tokenizer is available)
+        """
+        if self.tokenizer is None:
+            return content[:MAX_CONTENT_CHARS]
+        
+        # A byte-level BPE never yields more tokens than UTF-8 bytes, so short
+        # content can skip encoding (characters alone are no bound for emoji/CJK)
+        if len(content.encode("utf-8")) <= MAX_CONTENT_TOKENS:
+            return content
+        
+        tokens = self.tokenizer.encode(content)
+        if len(tokens) <= MAX_CONTENT_TOKENS:
+            return content
+        return self.tokenizer.decode(tokens[:MAX_CONTENT_TOKENS])
+    
+    def _get_pdf_content(self, age: int, topic: str) -> str:
+        """
+        Get PDF content for a topic, falling back to the full class content
+        Both lookups are served from the extractor's process-wide caches
+        
+        Args:
+            age: User's age (determines which PDF to use)
+            topic: Topic to find content for
+        
+        Returns:
+            PDF content, or empty string if none is sufficient
+        """
+        pdf_content = self.pdf_extractor.get_content_for_topic(age, topic)
+        
+        if not pdf_content or len(pdf_content.strip()) < 100:
+            logger.warning(f"⚠️  Limited PDF content found for topic: {topic}, fetching full class content")
+            pdf_content = self.pdf_extractor.get_full_class_content(age)
+            if not pdf_content or len(pdf_content.strip()) < 100:
+                return ""
+        
+        return pdf_content
+    
     def _generate_with_gpt4o(
         self,
         topic: str,
@@ -185,12 +340,13 @@ class PDFBasedQuestionGenerator:
                 return []
             
             # Truncate to fit token limits but keep it comprehensive
-            max_content_length = 3000
-            pdf_content = pdf_content[:max_content_length]
+            pdf_content = self._truncate_content(pdf_content)
             
             # Get age-appropriate context
-            age_context = self._get_age_context(age)
-            vocab_level = self._get_vocabulary_level(age)
+            if age in self._age_table:
+                age_context, vocab_level = self._age_table[age]
+            else:
+                age_context, vocab_level = self._get_age_context(age), self._get_vocabulary_level(age)
             
             # Get difficulty-specific instructions
             difficulty_instructions = self._get_difficulty_instructions(difficulty)
@@ -199,18 +355,12 @@ class PDFBasedQuestionGenerator:
             if hobbies:
                 hobbies_context = f"\nStudent's interests: {hobbies}\nWhere relevant, relate examples to their interests."
             
-            prompt = f"""You are an expert financial education teacher creating quiz questions.
-
-CRITICAL REQUIREMENTS:
-1. ALL questions MUST be answerable ONLY from the provided curriculum content below
-2. Do NOT create questions about information not in the curriculum
-3. Do NOT use external knowledge or make up facts
-4. Every question must directly test understanding of the curriculum material
-5. IMPORTANT: Every answer option MUST be COMPLETE and FULL sentences, NOT truncated
-6. Every answer option must be plausible but only ONE correct
-7. Vary the position of correct answers (use positions 0, 1, 2, and 3)
-8. Do NOT repeat or duplicate options across different questions
-9. Make options distinct and clearly different from each other
+            # Curriculum goes first: topics that resolve to the same PDF content then share
+            # the system prompt + curriculum prefix, which the provider serves from its cache
+            prompt = f"""CURRICULUM CONTENT (This is your ONLY source for questions):
+---START CURRICULUM---
+{pdf_content}
+---END CURRICULUM---
 
 DIFFICULTY LEVEL: {difficulty.upper()}
 {difficulty_instructions}
@@ -220,52 +370,25 @@ STUDENT PROFILE:
 - Learning level: {age_context}
 - Vocabulary: {vocab_level}{hobbies_context}
 
-CURRICULUM CONTENT (This is your ONLY source for questions):
----START CURRICULUM---
-{pdf_content}
----END CURRICULUM---
-
 TOPIC TO FOCUS ON: {topic}
 
 Generate {num_questions} multiple-choice questions about "{topic}" using ONLY the curriculum content above.
 
-For each question:
-1. Create a clear, unambiguous question based directly on the curriculum
-2. Provide 4 COMPLETE and DISTINCT options
-3. Mark the correct answer position (0-3)
-4. Provide a detailed explanation citing the curriculum
-5. Ensure questions vary in difficulty and topic coverage
-
-Return ONLY valid JSON:
-
-{{
-    "questions": [
-        {{
-            "question_id": "q_1",
-            "question": "Question text?",
-            "type": "multiple_choice",
-            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-            "correct_answer": 0,
-            "explanation": "Explanation with curriculum reference"
-        }}
-    ]
-}}
-
 Generate the questions now:"""
             
             logger.info(f"📤 Sending GPT-4o request for {num_questions} questions on '{topic}'")
             
-            # Call GPT-4o API with retries
+            # Call GPT-4o API with retries (streamed so questions are validated as they arrive)
             max_retries = 2
-            response = None
+            stream = None
             for attempt in range(max_retries):
                 try:
-                    response = self.azure_openai_client.chat.completions.create(
+                    stream = self.azure_openai_client.chat.completions.create(
                         model=AZURE_DEPLOYMENT_NAME,
                         messages=[
                             {
                                 "role": "system",
-                                "content": "You are an expert financial education teacher. Generate questions ONLY from the provided curriculum content."
+                                "content": QUESTION_SYSTEM_PROMPT
                             },
                             {
                                 "role": "user",
@@ -274,7 +397,8 @@ Generate the questions now:"""
                         ],
                         temperature=0.7,
                         max_tokens=1500,
-                        top_p=0.9
+                        top_p=0.9,
+                        stream=True
                     )
                     break
                 except Exception as e:
@@ -284,80 +408,117 @@ Generate the questions now:"""
                     else:
                         raise
             
-            if not response or not response.choices:
+            # Validate each question as soon as its JSON object closes in the stream
+            parser = QuestionStreamParser()
+            response_parts = []
+            questions = []
+            validated = []
+            try:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    response_parts.append(delta)
+                    
+                    for q in parser.feed(delta):
+                        questions.append(q)
+                        if self._validate_question(q, len(questions)):
+                            validated.append(q)
+                    
+                    if len(validated) >= num_questions:
+                        # Enough valid questions - stop generating the rest
+                        stream.close()
+                        break
+            except Exception as e:
+                # Keep whatever questions completed before the stream broke off
+                logger.error(f"❌ GPT-4o stream interrupted after {len(validated)} valid questions: {e}")
+                return validated[:num_questions]
+            
+            response_text = "".join(response_parts).strip()
+            if not response_text:
                 logger.error("❌ GPT-4o returned empty response")
                 return []
             
-            response_text = response.choices[0].message.content.strip()
             logger.info(f"📥 Received GPT-4o response ({len(response_text)} chars)")
             
-            # Clean up markdown code blocks if present
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.rstrip("```").strip()
-            
-            # Parse JSON
-            logger.info(f"📊 Parsing JSON response...")
-            questions_data = json.loads(response_text)
-            questions = questions_data.get("questions", [])
+            if not questions:
+                # No questions array found while streaming - parse the full response
+                if response_text.startswith("```"):
+                    response_text = response_text.split("```")[1]
+                    if response_text.startswith("json"):
+                        response_text = response_text[4:]
+                    response_text = response_text.rstrip("```").strip()
+                
+                logger.info(f"📊 Parsing JSON response...")
+                questions_data = json_utils.loads(response_text)
+                questions = questions_data.get("questions", [])
+                validated = [q for i, q in enumerate(questions) if self._validate_question(q, i + 1)]
             
             logger.info(f"✅ Parsed {len(questions)} questions from GPT-4o")
             
-            # Validate and clean questions
-            validated = []
-            for i, q in enumerate(questions):
-                try:
-                    # Strict validation
-                    if not q.get("question"):
-                        logger.warning(f"Skipping Q{i+1}: missing question text")
-                        continue
-                    
-                    if not q.get("options") or len(q.get("options", [])) != 4:
-                        logger.warning(f"Skipping Q{i+1}: doesn't have exactly 4 options")
-                        continue
-                    
-                    if "correct_answer" not in q:
-                        logger.warning(f"Skipping Q{i+1}: missing correct_answer")
-                        continue
-                    
-                    if not q.get("explanation"):
-                        logger.warning(f"Skipping Q{i+1}: missing explanation")
-                        continue
-                    
-                    # Validate correct_answer index
-                    correct_idx = q["correct_answer"]
-                    if not isinstance(correct_idx, int) or correct_idx < 0 or correct_idx >= 4:
-                        logger.warning(f"Skipping Q{i+1}: invalid correct_answer index {correct_idx}")
-                        continue
-                    
-                    # Set question_id
-                    if not q.get("question_id"):
-                        q["question_id"] = f"q_{i+1}"
-                    
-                    validated.append(q)
-                    logger.info(f"  ✅ Q{i+1}: Valid (correct at position {correct_idx})")
-                    
-                except Exception as e:
-                    logger.warning(f"Skipping Q{i+1}: {e}")
-                    continue
-            
             if not validated:
                 logger.error(f"❌ No valid questions after validation")
                 return []
             
             logger.info(f"✅ Validated {len(validated)}/{len(questions)} questions successfully")
-            return validated
+            # One delta can close several objects, overshooting the requested count
+            return validated[:num_questions]
             
-        except json.JSONDecodeError as e:
+        except json_utils.JSONDecodeError as e:
             logger.error(f"❌ JSON parsing error: {e}")
-            logger.error(f"Response text (first 500 chars): {response_text[:500] if response_text else 'Empty'}")
+            logger.error(f"Response text (first 500 chars): {response_text or 'Empty':.500}")
             return []
         except Exception as e:
             logger.error(f"❌ Error generating questions with GPT-4o: {e}", exc_info=True)
             return []
     
+    def _validate_question(self, q: Dict[str, Any], number: int) -> bool:
+        """
+        Strictly validate a generated question, filling in a missing question_id
+        
+        Args:
+            q: Question dictionary from GPT-4o
+            number: 1-based position of the question in the response
+        
+        Returns:
+            True if the question is usable
+        """
+        try:
+            if not q.get("question"):
+                logger.warning(f"Skipping Q{number}: missing question text")
+                return False
+            
+            if not q.get("options") or len(q.get("options", [])) != 4:
+                logger.warning(f"Skipping Q{number}: doesn't have exactly 4 options")
+                return False
+            
+            if "correct_answer" not in q:
+                logger.warning(f"Skipping Q{number}: missing correct_answer")
+                return False
+            
+            if not q.get("explanation"):
+                logger.warning(f"Skipping Q{number}: missing explanation")
+                return False
+            
+            # Validate correct_answer index
+            correct_idx = q["correct_answer"]
+            if not isinstance(correct_idx, int) or correct_idx < 0 or correct_idx >= 4:
+                logger.warning(f"Skipping Q{number}: invalid correct_answer index {correct_idx}")
+                return False
+            
+            # Set question_id
+            if not q.get("question_id"):
+                q["question_id"] = f"q_{number}"
+            
+            logger.info(f"  ✅ Q{number}: Valid (correct at position {correct_idx})")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Skipping Q{number}: {e}")
+            return False
+    
     def _get_age_context(self, age: int) -> str:
         """Get age-appropriate context for the prompt"""
         if age < 12:
@@ -482,7 +643,7 @@ Generate the questions now:"""
                     }
                     
                     questions.append(question)
-                    logger.info(f"  ✅ Created Q{len(questions)}: {question_text[:60]}...")
+                    logger.info(f"  ✅ Created Q{len(questions)}: {question_text:.60}...")
                     
                 except Exception as e:
                     logger.debug(f"Could not create question from sentence {idx}: {e}")
@@ -4,59 +4,48 @@ Suggests financial topics based on user age and PDF content from educational mat
 """
 
 import logging
-import os
-import json
+import re
 from typing import List, Dict, Any
 
-try:
-    from openai import AzureOpenAI
-    AZURE_OPENAI_AVAILABLE = True
-except ImportError:
-    AZURE_OPENAI_AVAILABLE = False
-
 from .pdf_content_extractor import PDFContentExtractor
+from .llm_client import AZURE_DEPLOYMENT_NAME, azure_openai_client
+from . import json_utils
 
 logger = logging.getLogger(__name__)
 
-# Configure Azure OpenAI (GPT-4o) as PRIMARY LLM
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
-AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME", "gpt-4o")
+# Metadata phrases that disqualify a raw PDF topic
+SKIP_PHRASES = ['workbook', 'class', 'edition', 'isbn', 'published', 'printed',
+                'author', 'cbse', 'index', 'page', 'shiksha kendra', 'ncfe',
+                'advisory', 'monitoring', 'editing', 'board', 'geography', 'history',
+                'financial education', 'national centre', 'exchange board',
+                'regulatory', 'development authority', 'insurance regulatory']
+
+# Precompiled matchers so each topic is scanned once instead of once per phrase
+SKIP_PATTERN = re.compile("|".join(re.escape(phrase) for phrase in SKIP_PHRASES), re.IGNORECASE)
+PAGE_PATTERN = re.compile(r'Page|page|No\.|no\.')
+
+# Minimum number of past quizzes before GPT-4o performance analysis is worth a call
+MIN_HISTORY_FOR_ANALYSIS = 3
+
+# Translation table that deletes ASCII digits, used to count digits in one C-level pass
+STRIP_DIGITS = str.maketrans('', '', '0123456789')
 
 
 class TopicSuggester:
     """Suggests topics based on PDF content and user age using GPT-4o"""
     
-    def __init__(self):
-        """Initialize GPT-4o client and PDF extractor"""
-        self.model = None
-        if OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_AVAILABLE:
-            try:
-                self.model = AzureOpenAI(
-                    api_key=OPENAI_API_KEY,
-                    api_version="2024-02-15-preview",
-                    azure_endpoint=AZURE_OPENAI_ENDPOINT
-                )
-                logger.info("✅ Azure OpenAI (GPT-4o) initialized for topic suggestion")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Azure OpenAI: {e}")
-                self.model = None
+    def __init__(self, pdf_extractor: PDFContentExtractor = None):
+        """Initialize GPT-4o client and PDF extractor (shared when one is passed in)"""
+        # Reuse the process-wide GPT-4o client so topic and question requests
+        # share one keep-alive connection pool instead of opening their own
+        self.model = azure_openai_client
+        if self.model:
+            logger.info("✅ Azure OpenAI (GPT-4o) initialized for topic suggestion")
         else:
-            missing_vars = []
-            if not OPENAI_API_KEY:
-                missing_vars.append("OPENAI_API_KEY")
-            if not AZURE_OPENAI_ENDPOINT:
-                missing_vars.append("AZURE_OPENAI_ENDPOINT")
-            if not AZURE_OPENAI_AVAILABLE:
-                missing_vars.append("openai library")
-            
-            vars_str = ", ".join(missing_vars) if missing_vars else "unknown"
-            logger.warning(f"⚠️  Azure OpenAI (GPT-4o) not available. Missing: {vars_str}")
-            logger.warning(f"📖 See AZURE_OPENAI_SETUP.md for configuration instructions")
             logger.info("ℹ️  Will use PDF-based topic extraction")
         
         # Initialize PDF content extractor
-        self.pdf_extractor = PDFContentExtractor()
+        self.pdf_extractor = pdf_extractor or PDFContentExtractor()
         logger.info("✅ PDF Content Extractor initialized")
     
     def get_topics_for_age(self, age: int, previous_topics: List[str] = None) -> List[str]:
@@ -92,7 +81,8 @@ class TopicSuggester:
             
             # Step 3: Filter out previously covered topics
             if previous_topics:
-                filtered = [t for t in cleaned_topics if t.lower() not in [pt.lower() for pt in previous_topics]]
+                covered = {pt.lower() for pt in previous_topics}
+                filtered = [t for t in cleaned_topics if t.lower() not in covered]
                 if filtered:
                     cleaned_topics = filtered
                 logger.info(f"[TopicSuggester] Filtered to {len(cleaned_topics)} topics after removing previous ones")
@@ -118,30 +108,26 @@ class TopicSuggester:
             Filtered topics from PDF
         """
         filtered = []
-        skip_phrases = ['workbook', 'class', 'edition', 'isbn', 'published', 'printed', 
-                       'author', 'cbse', 'index', 'page', 'shiksha kendra', 'ncfe',
-                       'advisory', 'monitoring', 'editing', 'board', 'geography', 'history',
-                       'financial education', 'national centre', 'exchange board',
-                       'regulatory', 'development authority', 'insurance regulatory']
         
         for topic in raw_topics:
             # Skip if too short or contains metadata
             if len(topic) < 5 or len(topic) > 100:
                 continue
-            if any(skip in topic.lower() for skip in skip_phrases):
+            if SKIP_PATTERN.search(topic):
                 continue
             # Skip if mostly digits or has weird formatting
-            if sum(1 for c in topic if c.isdigit()) > len(topic) / 3:
+            if len(topic) - len(topic.translate(STRIP_DIGITS)) > len(topic) / 3:
                 continue
             # Skip if has page number patterns
-            if any(c in topic for c in ['Page', 'page', 'No.', 'no.']):
+            if PAGE_PATTERN.search(topic):
                 continue
             
             cleaned = topic.strip()
             if cleaned and len(cleaned) > 5:
                 filtered.append(cleaned)
         
-        return filtered[:10]
+        # Stripping can make topics collide; drop repeats but keep PDF order
+        return list(dict.fromkeys(filtered))[:10]
     
     
     def get_difficulty_recommendation(self, score: int, max_score: int) -> str:
@@ -210,12 +196,25 @@ class TopicSuggester:
                     "insight": "Keep practicing to improve!"
                 }
             
+            # Templated feedback is as good as GPT-4o for extreme scores or too little
+            # history to describe a trend, so skip the API call for those cases
+            score_bucket = round(current_percentage / 10) * 10
+            if score_bucket in (0, 100) or len(quiz_history or []) < MIN_HISTORY_FOR_ANALYSIS:
+                return {
+                    "success": False,
+                    "next_difficulty": next_difficulty,
+                    "feedback": self.get_feedback_message(int(current_percentage), max_score),
+                    "insight": "Keep practicing to improve!",
+                    "percentage": current_percentage
+                }
+            
             # Build history context
             history_context = ""
             if quiz_history:
                 avg_score = sum(q.get('percentage', 0) for q in quiz_history[-10:]) / min(10, len(quiz_history))
-                topics = list(set([q.get('topic', '') for q in quiz_history if q.get('topic')]))
-                topic_str = ", ".join(topics[-3:]) if topics else "various topics"
+                # History is newest first; dedup in order so the prompt names the latest topics
+                topics = list(dict.fromkeys(q.get('topic') for q in quiz_history if q.get('topic')))
+                topic_str = ", ".join(topics[:3]) if topics else "various topics"
                 history_context = f"\nRecent topics: {topic_str}\nPrevious average: {avg_score:.0f}%"
             
             prompt = f"""You are an encouraging educational coach analyzing a student's quiz performance.
@@ -247,7 +246,7 @@ Be specific, encouraging, and constructive. Keep it short and motivating."""
             
             # Parse JSON response
             response_text = response.choices[0].message.content.strip()
-            result = json.loads(response_text)
+            result = json_utils.loads(response_text)
             
             return {
                 "success": True,
@@ -3,17 +3,53 @@ Vector Store Service
 Manages embeddings and similarity search using FAISS or simple in-memory store
 """
 
-import json
 import logging
-import pickle
 from typing import List, Dict, Any
 from pathlib import Path
 import numpy as np
 
+from . import json_utils
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 EMBEDDINGS_DIR = Path(__file__).parent.parent.parent / "data" / "embeddings"
 
+# Vocabulary for the term-frequency proxy embedding (limited to common financial terms)
+FINANCIAL_TERMS = (
+    "money", "save", "spend", "earn", "invest", "budget", "credit",
+    "debt", "interest", "goal", "bank", "account", "stock", "bond",
+    "profit", "loss", "income", "expense", "financial", "wealth",
+    "rich", "poor", "buy", "sell", "trade", "price", "value",
+    "kid", "child", "education", "learn", "understand", "financial literacy",
+    "smart", "wise", "future", "plan", "goal", "business", "work"
+)
+
+
+if NUMBA_AVAILABLE:
+    # Compiled on the first search rather than at import; cache=True keeps the
+    # machine code on disk so later processes skip the compile entirely
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Fused dot-product scan over unit-normalized rows (one memory pass)"""
+        n_rows, n_dims = matrix.shape
+        scores = np.empty(n_rows)
+        for i in prange(n_rows):
+            total = 0.0
+            for j in range(n_dims):
+                total += matrix[i, j] * query[j]
+            scores[i] = total
+        return scores
+else:
+    def _cosine_scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot-product scan over unit-normalized rows"""
+        return matrix @ query
+
 
 class VectorStore:
     """
@@ -26,6 +62,9 @@ class VectorStore:
         self.vectors = {}  # id -> embedding
         self.metadata = {}  # id -> metadata
         self.embeddings_dir = EMBEDDINGS_DIR
+        # Stacked, row-normalized copy of self.vectors; rebuilt lazily after changes
+        self._matrix = None
+        self._matrix_ids = []
         self.embeddings_dir.mkdir(parents=True, exist_ok=True)
 
     def add_documents(self, chunks: List[Dict[str, Any]]) -> int:
@@ -33,24 +72,28 @@ class VectorStore:
         Add chunked documents to vector store
         chunks: List of dicts with 'id', 'content', 'source', 'chunk_index'
         """
-        added_count = 0
-
-        for chunk in chunks:
-            try:
-                # Simple embedding: use character frequency (for MVP)
-                embedding = self._simple_embedding(chunk["content"])
-                
-                self.vectors[chunk["id"]] = embedding
-                self.metadata[chunk["id"]] = {
-                    "content": chunk["content"],
-                    "source": chunk["source"],
-                    "chunk_index": chunk["chunk_index"]
-                }
-                added_count += 1
+        # Validate up front so the embedding loop has no per-document exception handling
+        valid_chunks = [chunk for chunk in chunks if chunk.get("id") and chunk.get("content")]
+        skipped = len(chunks) - len(valid_chunks)
+        if skipped:
+            logger.error(f"Skipping {skipped} documents with missing id or content")
 
-            except Exception as e:
-                logger.error(f"Error adding document {chunk['id']}: {e}")
+        # Simple embedding (for MVP), computed for the whole batch in one pass
+        embeddings = self._simple_embeddings([chunk["content"] for chunk in valid_chunks])
+        self.vectors.update(
+            (chunk["id"], embeddings[i]) for i, chunk in enumerate(valid_chunks)
+        )
+        self.metadata.update(
+            (chunk["id"], {
+                "content": chunk["content"],
+                "source": chunk.get("source", ""),
+                "chunk_index": chunk.get("chunk_index", 0)
+            })
+            for chunk in valid_chunks
+        )
+        added_count = len(valid_chunks)
 
+        self._matrix = None
         logger.info(f"Added {added_count} documents to vector store")
         return added_count
 
@@ -65,101 +108,164 @@ class VectorStore:
 
         try:
             query_embedding = self._simple_embedding(query)
-            scores = {}
-
-            # Calculate cosine similarity with all vectors
-            for doc_id, vector in self.vectors.items():
-                similarity = self._cosine_similarity(query_embedding, vector)
-                scores[doc_id] = similarity
-
-            # Sort by similarity and return top_k
-            top_docs = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
-
-            results = []
-            for doc_id, score in top_docs:
-                results.append({
-                    "id": doc_id,
-                    "content": self.metadata[doc_id]["content"],
-                    "source": self.metadata[doc_id]["source"],
-                    "similarity_score": float(score)
-                })
-
-            return results
+            matrix, doc_ids = self._get_matrix()
+
+            # Calculate cosine similarity with all vectors in one pass
+            scores = _cosine_scores(matrix, query_embedding)
+
+            # Sort by similarity (stable, so ties keep insertion order) and return top_k
+            top_indices = np.argsort(-scores, kind="stable")[:top_k]
+
+            return [self._search_result(doc_ids[idx], scores[idx]) for idx in top_indices]
         except Exception as e:
             logger.error(f"Error in search: {e}")
             return []
 
-    def _simple_embedding(self, text: str) -> np.ndarray:
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
         """
-        Create simple embedding from text (MVP approach)
-        In production, use OpenAI embeddings or sentence-transformers
-        
-        This uses character frequency as a proxy embedding
+        Search for several queries at once
+        Scores every query against every document with one matrix product
         """
-        # Simple approach: create a sparse vector from character frequencies
-        # Limited to common financial terms for efficiency
-        
-        financial_terms = [
-            "money", "save", "spend", "earn", "invest", "budget", "credit",
-            "debt", "interest", "goal", "bank", "account", "stock", "bond",
-            "profit", "loss", "income", "expense", "financial", "wealth",
-            "rich", "poor", "buy", "sell", "trade", "price", "value",
-            "kid", "child", "education", "learn", "understand", "financial literacy",
-            "smart", "wise", "future", "plan", "goal", "business", "work"
-        ]
+        if not self.vectors:
+            logger.warning("Vector store is empty")
+            return [[] for _ in queries]
+        if not queries:
+            return []
 
-        # Create embedding vector based on term frequency
-        embedding = np.zeros(len(financial_terms))
-        text_lower = text.lower()
+        try:
+            query_matrix = self._simple_embeddings(queries)
+            matrix, doc_ids = self._get_matrix()
+            scores = query_matrix @ matrix.T
 
-        for i, term in enumerate(financial_terms):
-            embedding[i] = text_lower.count(term)
+            k = max(0, min(top_k, len(doc_ids)))
+            if k == 0:
+                return [[] for _ in queries]
 
-        # Normalize
-        norm = np.linalg.norm(embedding)
-        if norm > 0:
-            embedding = embedding / norm
+            batch_results = []
+            for row in scores:
+                # Keep every document scoring at least the k-th best (so ties at the cut-off
+                # all stay in), then stable-sort just those: same picks and order as search
+                kth_best = -np.partition(-row, k - 1)[k - 1]
+                candidates = np.flatnonzero(row >= kth_best)
+                top_indices = candidates[np.argsort(-row[candidates], kind="stable")[:k]]
+                batch_results.append([self._search_result(doc_ids[idx], row[idx]) for idx in top_indices])
+            return batch_results
+        except Exception as e:
+            logger.error(f"Error in batch search: {e}")
+            return [[] for _ in queries]
 
-        return embedding
+    def _search_result(self, doc_id: str, score: float) -> Dict[str, Any]:
+        """Build the search result dict for one document"""
+        return {
+            "id": doc_id,
+            "content": self.metadata[doc_id]["content"],
+            "source": self.metadata[doc_id]["source"],
+            "similarity_score": float(score)
+        }
+
+    def _get_matrix(self):
+        """
+        Get all vectors stacked into a row-normalized matrix
+        Cached until documents are added or the store is reloaded
+        """
+        if self._matrix is None:
+            self._matrix_ids = list(self.vectors.keys())
+            matrix = np.array([self.vectors[doc_id] for doc_id in self._matrix_ids], dtype=np.float64)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._matrix = np.ascontiguousarray(matrix / norms)
+        return self._matrix, self._matrix_ids
 
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+    def _simple_embedding(self, text: str) -> np.ndarray:
+        """
+        Create simple embedding from text (MVP approach)
+        In production, use OpenAI embeddings or sentence-transformers
+        """
+        return self._simple_embeddings([text])[0]
 
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+    def _simple_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts into one (N, D) row-normalized matrix
+        
+        This uses financial term frequency as a proxy embedding
+        """
+        counts = np.array(
+            [[text.count(term) for term in FINANCIAL_TERMS] for text in map(str.lower, texts)],
+            dtype=np.float64
+        ).reshape(len(texts), len(FINANCIAL_TERMS))
 
-        return float(dot_product / (norm1 * norm2))
+        # Normalize every row at once, leaving all-zero rows as they are
+        norms = np.linalg.norm(counts, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return counts / norms
 
     def save(self, filepath: str = None):
-        """Save vector store to disk"""
+        """
+        Save vector store to disk
+        Vectors go to <filepath>.npy (memory-mappable) and ids/metadata to <filepath>.json
+        """
         if filepath is None:
-            filepath = self.embeddings_dir / "vectorstore.pkl"
+            filepath = self.embeddings_dir / "vectorstore"
 
         try:
-            with open(filepath, "wb") as f:
-                pickle.dump({
-                    "vectors": self.vectors,
+            if not self.vectors:
+                logger.warning("Vector store is empty, nothing to save")
+                return
+
+            base_path = Path(filepath)
+            matrix, doc_ids = self._get_matrix()
+            np.save(base_path.with_suffix(".npy"), matrix)
+            with open(base_path.with_suffix(".json"), "w", encoding="utf-8") as f:
+                f.write(json_utils.dumps({
+                    "ids": doc_ids,
                     "metadata": self.metadata
-                }, f)
-            logger.info(f"Vector store saved to {filepath}")
+                }))
+            logger.info(f"Vector store saved to {base_path}")
         except Exception as e:
             logger.error(f"Error saving vector store: {e}")
 
+    def saved_mtime_ns(self, filepath: str = None) -> int:
+        """
+        When the saved store was last written (the older of its two files)
+        Returns 0 if it has not been saved
+        """
+        if filepath is None:
+            filepath = self.embeddings_dir / "vectorstore"
+
+        base_path = Path(filepath)
+        try:
+            return min(base_path.with_suffix(".npy").stat().st_mtime_ns,
+                       base_path.with_suffix(".json").stat().st_mtime_ns)
+        except OSError:
+            return 0
+
     def load(self, filepath: str = None):
-        """Load vector store from disk"""
+        """
+        Load vector store from disk
+        Vectors are memory-mapped read-only, so worker processes share one copy via the page cache
+        """
         if filepath is None:
-            filepath = self.embeddings_dir / "vectorstore.pkl"
+            filepath = self.embeddings_dir / "vectorstore"
 
         try:
-            if Path(filepath).exists():
-                with open(filepath, "rb") as f:
-                    data = pickle.load(f)
-                    self.vectors = data["vectors"]
-                    self.metadata = data["metadata"]
-                logger.info(f"Vector store loaded from {filepath}")
+            base_path = Path(filepath)
+            vectors_path = base_path.with_suffix(".npy")
+            meta_path = base_path.with_suffix(".json")
+            if vectors_path.exists() and meta_path.exists():
+                with open(meta_path, "rb") as f:
+                    data = json_utils.loads(f.read())
+                matrix = np.load(vectors_path, mmap_mode="r")
+                doc_ids = data["ids"]
+                if matrix.ndim != 2 or matrix.shape[1] != len(FINANCIAL_TERMS):
+                    logger.warning(f"Saved vector store at {base_path} uses a different embedding, ignoring it")
+                    return False
+
+                # Rows are views into the mapped file, not copies
+                self.vectors = {doc_id: matrix[i] for i, doc_id in enumerate(doc_ids)}
+                self.metadata = data["metadata"]
+                self._matrix = matrix
+                self._matrix_ids = doc_ids
+                logger.info(f"Vector store loaded from {base_path}")
                 return True
             return False
         except Exception as e:
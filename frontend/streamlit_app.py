@@ -3,10 +3,26 @@ Streamlit Frontend
 Interactive web interface for MoneyTales
 """
 
-import streamlit as st
-import requests
+import hashlib
+import hmac
 import json
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Page configuration
 st.set_page_config(
@@ -17,522 +33,197 @@ st.set_page_config(
 )
 
 # Custom CSS for modern, clean design with latest styling trends
-st.markdown("""
-<style>
-    :root {
-        /* Modern Color Palette - Inspired by latest design trends */
-        --primary: #6366f1;
-        --primary-light: #e0e7ff;
-        --primary-lighter: #f5f3ff;
-        --accent: #fbbf24;
-        --accent-light: #fef3c7;
-        --success: #10b981;
-        --warning: #f59e0b;
-        --error: #ef4444;
-        --dark: #1f2937;
-        --dark-light: #374151;
-        --gray: #6b7280;
-        --gray-light: #f3f4f6;
-        --gray-lighter: #f9fafb;
-        --border: #e5e7eb;
-    }
-    
-    /* Overall app styling */
-    html, body, [class*="css"] {
-        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif !important;
-        scroll-behavior: smooth;
-    }
-    
-    /* Main background - modern gradient */
-    .stMainBlockContainer {
-        background: linear-gradient(135deg, #f9fafb 0%, #ffffff 100%);
-        padding: 2rem 1rem !important;
-    }
-    
-    .main {
-        max-width: 1400px;
-        margin: 0 auto;
-    }
-    
-    /* Header styling - modern and bold */
-    h1 {
-        color: #6366f1;
-        font-weight: 900 !important;
-        letter-spacing: -0.8px;
-        margin: 0 !important;
-        padding: 0 !important;
-        font-size: 2.75rem !important;
-        line-height: 1.2 !important;
-    }
-    
-    h2 {
-        color: #1f2937;
-        font-weight: 800;
-        margin: 1.75rem 0 0.75rem 0 !important;
-        font-size: 2.125rem !important;
-        letter-spacing: -0.5px;
-    }
-    
-    h3 {
-        color: #1f2937;
-        font-weight: 700;
-        margin: 1.25rem 0 0.625rem 0 !important;
-        font-size: 1.5rem !important;
-    }
-    
-    h4 {
-        color: #374151;
-        font-weight: 700;
-        margin: 0.875rem 0 0.5rem 0 !important;
-        font-size: 1.125rem !important;
-    }
-    
-    /* Card styling - modern with subtle depth */
-    .card {
-        background: #ffffff;
-        border-radius: 16px;
-        padding: 24px;
-        margin: 0;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05);
-        border: 1px solid #f3f4f6;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    .card:hover {
-        box-shadow: 0 10px 25px rgba(99, 102, 241, 0.08);
-        border-color: #e0e7ff;
-        transform: translateY(-2px);
-    }
-    
-    .card-highlight {
-        background: linear-gradient(135deg, #f5f3ff 0%, #fef3c7 100%);
-        border: 1.5px solid #e0e7ff;
-    }
-    
-    /* Button styling - modern with rounded corners */
-    .stButton > button {
-        background: linear-gradient(135deg, #6366f1 0%, #818cf8 100%) !important;
-        color: #ffffff !important;
-        border: none !important;
-        border-radius: 10px !important;
-        padding: 12px 28px !important;
-        font-weight: 700 !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        box-shadow: 0 4px 15px rgba(99, 102, 241, 0.3) !important;
-        font-size: 0.95rem !important;
-        height: auto !important;
-        letter-spacing: 0.3px;
-    }
-    
-    .stButton > button:hover {
-        box-shadow: 0 8px 25px rgba(99, 102, 241, 0.4) !important;
-        transform: translateY(-2px) !important;
-        background: linear-gradient(135deg, #4f46e5 0%, #6366f1 100%) !important;
-    }
-    
-    .stButton > button:active {
-        transform: translateY(0) !important;
-    }
-    
-    /* Input styling - modern and clean */
-    .stSelectbox, .stRadio, .stTextInput, .stSlider {
-        border-radius: 10px;
-    }
-    
-    .stTextInput > div > div > input,
-    .stSelectbox > div > div,
-    .stDateInput > div > div > input {
-        background: #f9fafb !important;
-        border: 2px solid #f3f4f6 !important;
-        border-radius: 10px !important;
-        color: #1f2937 !important;
-        font-size: 0.95rem !important;
-        transition: all 0.2s ease !important;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stSelectbox > div > div:focus,
-    .stDateInput > div > div > input:focus {
-        border-color: #6366f1 !important;
-        box-shadow: 0 0 0 4px rgba(99, 102, 241, 0.1) !important;
-        background: #ffffff !important;
-    }
-    
-    /* Slider styling */
-    .stSlider > div > div > div > div {
-        background: #6366f1 !important;
-    }
-    
-    /* Metric cards - modern design */
-    .stMetric {
-        background: linear-gradient(135deg, #f9fafb 0%, #ffffff 100%);
-        border-radius: 16px;
-        padding: 20px;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05);
-        border: 1px solid #f3f4f6;
-        transition: all 0.3s ease;
-    }
-    
-    .stMetric:hover {
-        box-shadow: 0 8px 20px rgba(99, 102, 241, 0.1);
-    }
-    
-    .stMetricLabel {
-        color: #6b7280;
-        font-size: 0.85rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    /* Alert styling - modern colors */
-    .stAlert {
-        border-radius: 12px;
-        border-left: 4px solid;
-        padding: 16px !important;
-    }
-    
-    .stSuccess {
-        background-color: #f0fdf4 !important;
-        border-left-color: #10b981 !important;
-        color: #065f46 !important;
-    }
-    
-    .stWarning {
-        background-color: #fffbeb !important;
-        border-left-color: #f59e0b !important;
-        color: #78350f !important;
-    }
-    
-    .stError {
-        background-color: #fef2f2 !important;
-        border-left-color: #ef4444 !important;
-        color: #7f1d1d !important;
-    }
-    
-    .stInfo {
-        background-color: #f0f9ff !important;
-        border-left-color: #3b82f6 !important;
-        color: #0c2340 !important;
-    }
-    
-    /* Divider - subtle and modern */
-    hr {
-        border: 0;
-        height: 1px;
-        background: linear-gradient(90deg, transparent, #e5e7eb, transparent);
-        margin: 2rem 0 !important;
-    }
-    
-    /* User profile badge - modern */
-    .user-badge {
-        background: linear-gradient(135deg, #6366f1 0%, #818cf8 100%);
-        color: #ffffff;
-        padding: 10px 18px;
-        border-radius: 10px;
-        font-weight: 700;
-        font-size: 0.85rem;
-        display: inline-block;
-        margin: 0;
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3);
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    /* Quiz container - modern design */
-    .quiz-container {
-        background: #ffffff;
-        border-radius: 16px;
-        padding: 28px;
-        margin: 0;
-        border: 1px solid #f3f4f6;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05);
-    }
-    
-    .question-box {
-        background: linear-gradient(135deg, #f5f3ff 0%, #f9fafb 100%);
-        border-left: 4px solid #6366f1;
-        padding: 20px;
-        margin: 16px 0;
-        border-radius: 12px;
-        box-shadow: 0 2px 8px rgba(99, 102, 241, 0.08);
-        transition: all 0.2s ease;
-    }
-    
-    .question-box:hover {
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.12);
-    }
-    
-    .story-box {
-        background: linear-gradient(135deg, #f5f3ff 0%, #fef3c7 100%);
-        border: 1.5px solid #e0e7ff;
-        border-radius: 14px;
-        padding: 24px;
-        margin: 0 0 20px 0;
-        line-height: 1.8;
-        font-size: 1.05rem;
-        color: #1f2937;
-        box-shadow: 0 2px 8px rgba(99, 102, 241, 0.08);
-    }
-    
-    /* Radio button styling */
-    .stRadio > div {
-        flex-direction: column;
-        gap: 12px;
-    }
-    
-    /* Expander styling - modern */
-    .streamlit-expanderHeader {
-        background: linear-gradient(135deg, #f9fafb 0%, #ffffff 100%);
-        border-radius: 12px;
-        border: 1px solid #f3f4f6;
-        transition: all 0.2s ease;
-    }
-    
-    .streamlit-expanderHeader:hover {
-        background: linear-gradient(135deg, #f5f3ff 0%, #fef3c7 100%);
-        border-color: #e0e7ff;
-    }
-    
-    /* Tab styling - modern underline style with larger, bold text */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        border-bottom: 2px solid #f3f4f6;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background-color: transparent;
-        border-radius: 0;
-        border: none;
-        color: #6b7280;
-        font-weight: 800 !important;
-        font-size: 1.05rem !important;
-        padding: 16px 24px !important;
-        padding-bottom: 16px !important;
-        transition: all 0.2s ease;
-        letter-spacing: 0.3px;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        color: #6366f1;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: transparent;
-        color: #6366f1 !important;
-        border-bottom: 3px solid #6366f1 !important;
-        font-weight: 800 !important;
-    }
-    
-    /* Remove extra padding */
-    .element-container {
-        margin: 0;
-    }
-    
-    /* Column spacing */
-    .row-widget.stButton {
-        margin: 0;
-    }
-    
-    /* Text styling - improved sizes */
-    p {
-        margin: 0.625rem 0 !important;
-        color: #374151;
-        line-height: 1.7;
-        font-size: 1rem !important;
-        font-weight: 500;
-    }
-    
-    /* Topic and category cards - modern */
-    .topic-card {
-        background: linear-gradient(135deg, #ffffff 0%, #f9fafb 100%);
-        border: 1.5px solid #f3f4f6;
-        border-radius: 16px;
-        padding: 24px;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .topic-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(90deg, #6366f1, #fbbf24);
-        opacity: 0;
-        transition: opacity 0.3s ease;
-    }
-    
-    .topic-card:hover {
-        box-shadow: 0 12px 30px rgba(99, 102, 241, 0.1);
-        border-color: #e0e7ff;
-        transform: translateY(-4px);
-    }
-    
-    .topic-card:hover::before {
-        opacity: 1;
-    }
-    
-    /* Form input backgrounds - modern */
-    input[type="text"],
-    input[type="password"],
-    input[type="email"],
-    textarea {
-        background-color: #f9fafb !important;
-        border: 2px solid #f3f4f6 !important;
-        border-radius: 10px !important;
-        color: #1f2937 !important;
-        padding: 12px 14px !important;
-        transition: all 0.2s ease !important;
-    }
-    
-    input[type="text"]:focus,
-    input[type="password"]:focus,
-    input[type="email"]:focus,
-    textarea:focus {
-        border-color: #6366f1 !important;
-        outline: none;
-        box-shadow: 0 0 0 4px rgba(99, 102, 241, 0.1) !important;
-        background-color: #ffffff !important;
-    }
-    
-    /* Link styling - modern */
-    a {
-        color: #6366f1;
-        text-decoration: none;
-        font-weight: 600;
-        transition: all 0.2s ease;
-    }
-    
-    a:hover {
-        color: #4f46e5;
-        text-decoration: underline;
-    }
-    
-    /* Smooth transitions throughout */
-    * {
-        transition: background-color 0.2s ease, border-color 0.2s ease, color 0.2s ease !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_WHITESPACE_PATTERN = re.compile(r"\s+")
+CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = CSS_COMMENT_PATTERN.sub("", css)
+    css = CSS_WHITESPACE_PATTERN.sub(" ", css)
+    css = CSS_PUNCTUATION_PATTERN.sub(r"\1", css)
+    css = re.sub(r"(?<=[{;]) ?([\w-]+): ", r"\1:", css)
+    return css.replace(";}", "}").strip()
+
+
+@st.cache_data
+def load_css() -> str:
+    """Read and minify the app stylesheet once, returning the ready-to-emit <style> tag"""
+    css = (Path(__file__).parent / "static" / "app.css").read_text(encoding="utf-8")
+    return f"<style>{minify_css(css)}</style>"
+
+
+# Must be emitted on every run: elements a rerun skips are removed from the page.
+# Identical payloads are deduplicated by Streamlit's message cache instead
+# (see minCachedMessageSize in .streamlit/config.toml).
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # API Configuration
-API_BASE_URL = "http://localhost:8000/api"
+BACKEND_URL = os.getenv("MONEYTALES_BACKEND_URL", "http://localhost:8000").rstrip("/")
+API_BASE_URL = f"{BACKEND_URL}/api"
+
+# Seconds to wait for the backend socket; LLM-backed calls keep a long read
+# timeout, but an unreachable backend should fail fast instead of hanging
+CONNECT_TIMEOUT = 3.05
+
+# Fallback topics when suggestions cannot be loaded from the backend
+DEFAULT_TOPICS = (
+    "Money Basics",
+    "Saving Money",
+    "Budgeting",
+    "Earning Money",
+    "Understanding Credit",
+    "Introduction to Investing",
+)
 
-# Load user credentials from backend on startup
 @st.cache_resource
+def http() -> requests.Session:
+    """Shared HTTP session so backend calls reuse keep-alive connections.
+
+    Cached as a resource, so one pool lives for the whole process and is shared
+    by every browser session and script rerun. Dropped keep-alive sockets and
+    gateway errors on GETs are retried quickly; urllib3 never retries reads or
+    error statuses for POSTs by default, so quiz calls are never repeated.
+    """
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.1, status_forcelist=(502, 503, 504), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_json(response: requests.Response):
+    """Decode a backend JSON body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+# Load user credentials from backend; refreshed every minute and on registration.
+# Only the login page needs them, so they are fetched lazily from there.
+@st.cache_data(ttl=60, show_spinner=False)
 def load_user_credentials():
     """Load registered user credentials from backend"""
     try:
-        response = requests.get(f"http://localhost:8000/api/auth/credentials", timeout=5)
+        response = http().get(f"{API_BASE_URL}/auth/credentials", timeout=5)
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             return data.get("credentials", {})
     except Exception as e:
         print(f"Could not load credentials from backend: {e}")
     return {}
 
 # Session state
-if "authenticated" not in st.session_state:
+SESSION_DEFAULTS = {
+    "authenticated": False,
+    "username": None,
+    "user_id": None,
+    "user_age": None,
+    "current_quiz": None,
+    "quiz_result": None,
+    "page": "explore",
+    "show_register": False,
+    "login_topics": None,
+}
+# setdefault leaves existing keys alone, so keys added later still reach live sessions
+for key, value in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+# Mutable default: each session gets its own list
+st.session_state.setdefault("current_answers", [])
+
+
+def flash(kind, message):
+    """Queue a message to show after the next rerun instead of sleeping before it"""
+    st.session_state.setdefault("flash_messages", []).append((kind, message))
+
+
+def show_flash_messages():
+    """Render and clear any messages queued by flash()"""
+    for kind, message in st.session_state.pop("flash_messages", []):
+        getattr(st, kind)(message)
+
+
+USER_BADGE_TEMPLATE = "<div style='text-align: right; padding-top: 8px;'><div class='user-badge'>👤 {username}</div></div>"
+HEADER_TAGLINE_HTML = "<p style='color: #64748b; font-size: 0.95rem; margin: 4px 0 16px 0;'>Learn Money Management the Fun Way</p><hr/>"
+
+
+# Session keys that belong to one signed-in user and are dropped at sign-out
+SIGN_OUT_CLEARED_KEYS = ("health_future", "health_result", "health_interval", "health_next_probe_at", "prefetched_user_id")
+
+
+def sign_out():
+    """Button callback: clear the session's user before the click's rerun"""
     st.session_state.authenticated = False
-if "username" not in st.session_state:
     st.session_state.username = None
-if "user_id" not in st.session_state:
     st.session_state.user_id = None
-if "user_age" not in st.session_state:
     st.session_state.user_age = None
-if "current_quiz" not in st.session_state:
     st.session_state.current_quiz = None
-if "current_answers" not in st.session_state:
-    st.session_state.current_answers = []
-if "page" not in st.session_state:
+    st.session_state.quiz_result = None
+    st.session_state.login_topics = None
     st.session_state.page = "explore"
-if "show_register" not in st.session_state:
-    st.session_state.show_register = False
-if "available_topics" not in st.session_state:
-    st.session_state.available_topics = []
-
-# User credentials mapping - only load from backend
-REGISTERED_CREDENTIALS = load_user_credentials()
-USERS_CREDENTIALS = REGISTERED_CREDENTIALS
+    # Per-user probe and prefetch state, so the next sign-in starts fresh
+    for key in SIGN_OUT_CLEARED_KEYS:
+        st.session_state.pop(key, None)
+    st.toast("Signed out successfully!", icon="✅")
 
 
 def render_header():
     """Render professional header with navigation and user menu"""
+    # The login page has its own hero; nothing to render without a session
+    if not st.session_state.authenticated:
+        return
+    
     col1, col2, col3 = st.columns([1.5, 2, 1])
     
     with col1:
-        st.markdown("<h1>💰 MoneyTales</h1>", unsafe_allow_html=True)
+        st.title("💰 MoneyTales", anchor=False)
     
     with col3:
-        if st.session_state.authenticated:
-            # Create a container for user menu with dropdown
-            st.markdown("""
-            <style>
-            .user-menu-container {
-                display: flex;
-                justify-content: flex-end;
-                align-items: center;
-            }
-            .user-dropdown {
-                position: relative;
-                display: inline-block;
-            }
-            .user-dropdown-content {
-                display: none;
-                position: absolute;
-                right: 0;
-                background-color: white;
-                min-width: 200px;
-                box-shadow: 0 8px 16px rgba(0,0,0,0.2);
-                padding: 12px 0;
-                z-index: 1;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }
-            .user-dropdown-content a {
-                color: #1e293b;
-                padding: 12px 16px;
-                text-decoration: none;
-                display: block;
-                transition: background-color 0.2s;
-            }
-            .user-dropdown-content a:hover {
-                background-color: #f1f5f9;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-            
-            col_profile, col_menu = st.columns([3, 1], gap="small")
-            
-            with col_profile:
-                st.markdown(f"""
-                <div style='text-align: right; padding-top: 8px;'>
-                    <div class='user-badge'>👤 {st.session_state.username}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col_menu:
-                if st.button("Sign Out", use_container_width=False, key="signout_btn", help="Logout from your account"):
-                    st.session_state.authenticated = False
-                    st.session_state.username = None
-                    st.session_state.user_id = None
-                    st.session_state.user_age = None
-                    st.session_state.current_quiz = None
-                    st.session_state.available_topics = []
-                    st.session_state.page = "explore"
-                    st.success("✅ Signed out successfully!")
-                    import time
-                    time.sleep(1)
-                    st.rerun()
-    
-    # Subheader text
-    st.markdown("<p style='color: #64748b; font-size: 0.95rem; margin: 4px 0 16px 0;'>Learn Money Management the Fun Way</p>", unsafe_allow_html=True)
+        col_profile, col_menu = st.columns([3, 1], gap="small")
+        
+        with col_profile:
+            st.markdown(USER_BADGE_TEMPLATE.format(username=st.session_state.username), unsafe_allow_html=True)
+        
+        with col_menu:
+            st.button("Sign Out", use_container_width=False, key="signout_btn", help="Logout from your account", on_click=sign_out)
     
-    st.markdown("---")
+    # Subheader text and divider as one element
+    st.markdown(HEADER_TAGLINE_HTML, unsafe_allow_html=True)
+
+
+def centered_submit_button(label):
+    """Form submit button filling the middle third of the row"""
+    _, middle, _ = st.columns(3)
+    with middle:
+        return st.form_submit_button(label, use_container_width=True)
+
+
+# Login page markup, each emitted as a single element
+LOGIN_HERO_HTML = """
+<div style='text-align: center; padding: 3rem 0;'></div>
+<div style='text-align: center; margin-bottom: 2rem;'>
+    <h1 style='font-size: 3rem; margin: 0;'>💰 MoneyTales</h1>
+    <p style='color: #64748b; font-size: 1.1rem; margin: 0.5rem 0 0 0; font-weight: 500;'>Financial Education for Kids</p>
+</div>
+<hr/>
+"""
+SIGN_IN_INTRO_HTML = (
+    "<h2 style='text-align: center; margin-top: 0;'>Sign In to Your Account</h2>"
+    "<p style='text-align: center; color: #64748b; margin-bottom: 1.5rem;'>Access your learning dashboard and continue your journey</p>"
+)
+REGISTER_INTRO_HTML = (
+    "<h2 style='text-align: center; margin-top: 0;'>Create Your Account</h2>"
+    "<p style='text-align: center; color: #64748b; margin-bottom: 1.5rem;'>Join MoneyTales and start your financial learning journey</p>"
+)
+LOGIN_FOOTER_HTML = "<div style='text-align: center; padding: 2rem 0; color: #94a3b8; font-size: 0.875rem;'><p>💰 <strong>MoneyTales</strong> v1.0</p></div>"
+
+# Login form field text
+LOGIN_USERNAME_PLACEHOLDER = "Enter your username"
+LOGIN_USERNAME_HELP = "Your unique username"
+LOGIN_PASSWORD_PLACEHOLDER = "Enter your password"
+LOGIN_PASSWORD_HELP = "Your account password"
 
 
 def login_page():
@@ -540,47 +231,35 @@ def login_page():
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
-        st.markdown("<div style='text-align: center; padding: 3rem 0;'></div>", unsafe_allow_html=True)
-        
         # Logo and main heading
-        st.markdown("""
-        <div style='text-align: center; margin-bottom: 2rem;'>
-            <h1 style='font-size: 3rem; margin: 0;'>💰 MoneyTales</h1>
-            <p style='color: #64748b; font-size: 1.1rem; margin: 0.5rem 0 0 0; font-weight: 500;'>Financial Education for Kids</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("---")
+        st.markdown(LOGIN_HERO_HTML, unsafe_allow_html=True)
         
         # Tab selection for Sign In vs Register
         tab1, tab2 = st.tabs(["🔓 Sign In", "📝 Register"])
         
         with tab1:
-            st.markdown("<h2 style='text-align: center; margin-top: 0;'>Sign In to Your Account</h2>", unsafe_allow_html=True)
-            st.markdown("<p style='text-align: center; color: #64748b; margin-bottom: 1.5rem;'>Access your learning dashboard and continue your journey</p>", unsafe_allow_html=True)
+            st.markdown(SIGN_IN_INTRO_HTML, unsafe_allow_html=True)
             
             # Login form with improved styling
             with st.form("login_form", border=True):
                 username = st.text_input(
                     "Username",
-                    placeholder="Enter your username",
+                    placeholder=LOGIN_USERNAME_PLACEHOLDER,
                     key="login_username",
-                    help="Your unique username"
+                    help=LOGIN_USERNAME_HELP
                 )
                 
                 password = st.text_input(
                     "Password",
                     type="password",
-                    placeholder="Enter your password",
+                    placeholder=LOGIN_PASSWORD_PLACEHOLDER,
                     key="login_password",
-                    help="Your account password"
+                    help=LOGIN_PASSWORD_HELP
                 )
                 
                 st.markdown("<div style='margin-top: 1.5rem;'></div>", unsafe_allow_html=True)
                 
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col2:
-                    login_btn = st.form_submit_button("Sign In", use_container_width=True)
+                login_btn = centered_submit_button("Sign In")
             
             if login_btn:
                 if not username or not password:
@@ -588,20 +267,21 @@ def login_page():
                 else:
                     # Try backend login first
                     try:
-                        response = requests.post(
-                            "http://localhost:8000/api/auth/login",
+                        response = http().post(
+                            f"{API_BASE_URL}/auth/login",
                             json={"username": username, "password": password},
                             timeout=10
                         )
                         
                         if response.status_code == 200:
-                            user_data = response.json()
+                            user_data = parse_json(response)
                             st.session_state.authenticated = True
                             st.session_state.username = user_data["name"]
                             st.session_state.user_id = user_data["user_id"]
                             st.session_state.user_age = user_data.get("age", 10)
-                            st.session_state.available_topics = []  # Reset topics to reload them
-                            st.success(f"✅ Welcome, {user_data['name']}!")
+                            # Backend login also returns topic suggestions, saving a round trip
+                            st.session_state.login_topics = user_data.get("topics") or None
+                            flash("success", f"✅ Welcome, {user_data['name']}!")
                             st.rerun()
                         elif response.status_code == 401:
                             st.error("❌ Invalid username or password")
@@ -609,24 +289,23 @@ def login_page():
                             st.error(f"❌ Login failed: {response.text}")
                     except Exception as e:
                         # Fallback to local credentials if backend unavailable
-                        if username.lower() not in USERS_CREDENTIALS:
+                        user_data = load_user_credentials().get(username.lower())
+                        if user_data is None:
                             st.error("❌ Username not found")
-                        elif USERS_CREDENTIALS[username.lower()]["password"] != password:
+                        # Compared as bytes: compare_digest rejects non-ASCII str
+                        elif not hmac.compare_digest(user_data["password"].encode("utf-8"), password.encode("utf-8")):
                             st.error("❌ Incorrect password")
                         else:
                             # Login successful with local credentials
-                            user_data = USERS_CREDENTIALS[username.lower()]
                             st.session_state.authenticated = True
                             st.session_state.username = user_data["name"]
                             st.session_state.user_id = user_data["user_id"]
                             st.session_state.user_age = user_data.get("age", 10)
-                            st.session_state.available_topics = []  # Reset topics to reload them
-                            st.success(f"✅ Welcome, {user_data['name']}!")
+                            flash("success", f"✅ Welcome, {user_data['name']}!")
                             st.rerun()
         
         with tab2:
-            st.markdown("<h2 style='text-align: center; margin-top: 0;'>Create Your Account</h2>", unsafe_allow_html=True)
-            st.markdown("<p style='text-align: center; color: #64748b; margin-bottom: 1.5rem;'>Join MoneyTales and start your financial learning journey</p>", unsafe_allow_html=True)
+            st.markdown(REGISTER_INTRO_HTML, unsafe_allow_html=True)
             
             # Registration form with improved styling
             with st.form("register_form", border=True):
@@ -678,9 +357,7 @@ def login_page():
                 
                 st.markdown("<div style='margin-top: 1.5rem;'></div>", unsafe_allow_html=True)
                 
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col2:
-                    register_btn = st.form_submit_button("Create Account", use_container_width=True)
+                register_btn = centered_submit_button("Create Account")
             
             if register_btn:
                 # Validation
@@ -692,11 +369,10 @@ def login_page():
                     st.error("❌ Password must be at least 6 characters")
                 elif password_reg != confirm_password:
                     st.error("❌ Passwords do not match")
-                elif username_reg.lower() in USERS_CREDENTIALS:
+                elif username_reg.lower() in load_user_credentials():
                     st.error("❌ Username already exists")
                 else:
                     # Generate user ID
-                    import uuid
                     new_user_id = f"user_{uuid.uuid4().hex[:8]}"
                     
                     # Store hobbies as comma-separated string
@@ -704,8 +380,8 @@ def login_page():
                     
                     # Call backend to save user
                     try:
-                        response = requests.post(
-                            "http://localhost:8000/api/auth/register",
+                        response = http().post(
+                            f"{API_BASE_URL}/auth/register",
                             json={
                                 "user_id": new_user_id,
                                 "name": name,
@@ -719,149 +395,278 @@ def login_page():
                         
                         if response.status_code == 200 or response.status_code == 201:
                             # Registration successful
-                            user_data = response.json()
+                            user_data = parse_json(response)
                             
-                            # Add to local credentials for immediate use
-                            USERS_CREDENTIALS[username_reg.lower()] = {
-                                "user_id": user_data.get("user_id", new_user_id),
-                                "name": name,
-                                "password": password_reg,
-                                "age": age
-                            }
+                            # Let every session pick up the new account
+                            load_user_credentials.clear()
                             
-                            st.success("✅ Account created successfully!")
-                            st.info("Logging you in automatically...")
+                            flash("success", "✅ Account created successfully!")
                             
-                            # Auto-login after registration
-                            import time
-                            time.sleep(1)
-                            
-                            # Set session state for automatic login
+                            # Auto-login after registration: set session state for automatic login
                             st.session_state.authenticated = True
                             st.session_state.username = name
                             st.session_state.user_id = user_data.get("user_id", new_user_id)
                             st.session_state.user_age = age
-                            st.session_state.available_topics = []
-                            
-                            time.sleep(0.5)
                             st.rerun()
                         else:
                             st.error(f"❌ Registration failed: {response.text}")
                     except Exception as e:
-                        st.warning(f"⚠️ Could not sync with server, but account created locally: {e}")
-                        st.info("You can now sign in with your new account")
-                        import time
-                        time.sleep(2)
+                        flash("warning", f"⚠️ Could not sync with server, but account created locally: {e}")
+                        flash("info", "You can now sign in with your new account")
                         st.rerun()
         
-        st.markdown("<div style='text-align: center; padding: 2rem 0; color: #94a3b8; font-size: 0.875rem;'><p>💰 <strong>MoneyTales</strong> v1.0</p></div>", unsafe_allow_html=True)
+        st.markdown(LOGIN_FOOTER_HTML, unsafe_allow_html=True)
+
+
+# Navigation tabs: (label, page id, tooltip)
+NAV_ITEMS = (
+    ("🏠 Explore", "explore", "Go to Explore"),
+    ("📈 Progress", "progress", "Go to Progress"),
+    ("🏅 Leaderboard", "leaderboard", "Go to Leaderboard"),
+    ("⚙️ Settings", "settings", "Go to Settings"),
+)
+ACTIVE_TAB_TEMPLATE = "<div style='text-align: center; padding: 14px 12px; background: linear-gradient(135deg, #6366f1 0%, #818cf8 100%); border-radius: 10px; font-size: 1.15rem; font-weight: 800; color: white; cursor: pointer;'>{label}</div>"
+ACTIVE_TAB_HTML = {page_id: ACTIVE_TAB_TEMPLATE.format(label=label) for label, page_id, _ in NAV_ITEMS}
 
 
 def render_navigation():
     """Render top navigation with larger, bold text"""
-    nav_items = [
-        ("🏠 Explore", "explore"),
-        ("📈 Progress", "progress"),
-        ("🏅 Leaderboard", "leaderboard"),
-        ("⚙️ Settings", "settings"),
-    ]
-    
     # Create 4 equal columns for navigation
-    cols = st.columns(4)
+    cols = st.columns(len(NAV_ITEMS))
     
-    for i, (label, page_id) in enumerate(nav_items):
-        with cols[i]:
-            is_active = st.session_state.page == page_id
-            
+    for col, (label, page_id, help_text) in zip(cols, NAV_ITEMS):
+        with col:
             # Increase button text size and make active state more prominent
-            if is_active:
-                st.markdown(f"<div style='text-align: center; padding: 14px 12px; background: linear-gradient(135deg, #6366f1 0%, #818cf8 100%); border-radius: 10px; font-size: 1.15rem; font-weight: 800; color: white; cursor: pointer;'>{label}</div>", unsafe_allow_html=True)
+            if st.session_state.page == page_id:
+                st.markdown(ACTIVE_TAB_HTML[page_id], unsafe_allow_html=True)
             else:
-                if st.button(label, key=f"nav_{page_id}", use_container_width=True, help=f"Go to {label.split()[-1]}"):
+                if st.button(label, key=f"nav_{page_id}", use_container_width=True, help=help_text):
                     st.session_state.page = page_id
                     st.rerun()
     
     st.markdown("---")
 
 
-def explore_page():
-    """Unified Home + Take Quiz page with age-based topic suggestions"""
+@st.cache_data(ttl=600, show_spinner="📚 Loading age-appropriate topics...")
+def fetch_topics(user_id, age):
+    """Fetch age-based topic suggestions; failures raise so they are not cached"""
+    response = http().post(
+        f"{API_BASE_URL}/topics/suggestions",
+        json={"user_id": user_id, "age": age},
+        timeout=10
+    )
+    response.raise_for_status()
+    return parse_json(response).get("topics", [])
+
+
+# Difficulty markers; anything unrecognised is shown as hard, as before
+DIFFICULTY_EMOJI = {"EASY": "🟢", "MEDIUM": "🟡", "HARD": "🔴"}
+
+
+def difficulty_badge(difficulty):
+    """Build the difficulty tag shown above a generated quiz"""
+    return f"""
+        <div style='display: flex; align-items: center; margin-bottom: 1rem;'>
+            <span style='font-size: 1.5rem; margin-right: 0.5rem;'>{DIFFICULTY_EMOJI.get(difficulty, "🔴")}</span>
+            <span style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 6px 14px; border-radius: 20px; font-weight: 600; font-size: 0.875rem;'>
+                {difficulty} Difficulty
+            </span>
+        </div>
+        """
+
+
+DIFFICULTY_BADGE_HTML = {difficulty: difficulty_badge(difficulty) for difficulty in DIFFICULTY_EMOJI}
+
+
+# Unfinished quizzes survive page reloads and restarts for up to an hour
+QUIZ_CACHE_DIR = Path(__file__).parent / ".quiz_cache"
+QUIZ_CACHE_TTL = 3600
+
+
+def _quiz_cache_path(user_id, topic):
+    """Cache file for a user's quiz on a topic"""
+    key = hashlib.sha1(f"{user_id}:{topic}".encode("utf-8")).hexdigest()
+    return QUIZ_CACHE_DIR / f"{key}.json"
+
+
+def save_cached_quiz(user_id, topic, quiz):
+    """Persist a generated quiz so it can be resumed without another LLM call"""
+    try:
+        QUIZ_CACHE_DIR.mkdir(exist_ok=True)
+        data = orjson.dumps(quiz) if orjson is not None else json.dumps(quiz).encode("utf-8")
+        _quiz_cache_path(user_id, topic).write_bytes(data)
+    except OSError:
+        # Best effort, like the other quiz cache helpers: the quiz still works uncached
+        pass
+
+
+def load_cached_quiz(user_id, topic):
+    """Return the unfinished quiz for (user_id, topic), or None if absent or expired"""
+    path = _quiz_cache_path(user_id, topic)
+    try:
+        if time.time() - path.stat().st_mtime > QUIZ_CACHE_TTL:
+            path.unlink()
+            return None
+        data = path.read_bytes()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except (OSError, ValueError):
+        return None
+
+
+def clear_cached_quiz(user_id, topic):
+    """Drop a quiz from the cache once it has been submitted"""
+    _quiz_cache_path(user_id, topic).unlink(missing_ok=True)
+
+
+# Characters of question text shown in a collapsed review entry
+QUESTION_PREVIEW_CHARS = 60
+
+
+QUESTION_BOX_TEMPLATE = "<div class='question-box'><strong>Question {number} of {total}</strong><br><h4 style='margin: 8px 0 0 0;'>{question}</h4></div>"
+
+def render_review(question_feedback):
+    """Render the per-question Detailed Review, three elements per question"""
+    labels = [
+        f"{'✅' if qf['is_correct'] else '❌'} Question {idx}: {qf['question'][:QUESTION_PREVIEW_CHARS]}..."
+        for idx, qf in enumerate(question_feedback, 1)
+    ]
     
-    st.markdown("<h2>🎯 Take a Quiz</h2>", unsafe_allow_html=True)
-    st.markdown(f"<p style='font-size: 1rem; color: #64748b; margin: 0 0 1.5rem 0;'>Hello {st.session_state.username}! Choose a topic and start learning (difficulty will be auto-selected based on your performance)</p>", unsafe_allow_html=True)
+    for label, qf in zip(labels, question_feedback):
+        with st.expander(label):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.info(f"**Your Answer:**\n\n{qf['user_answer']}")
+            
+            with col2:
+                if not qf['is_correct']:
+                    st.success(f"**Correct Answer:**\n\n{qf['correct_answer']}")
+            
+            st.markdown(f"**Explanation:**\n\n{qf['explanation']}")
+
+
+def start_another_quiz():
+    """Button callback: drop the finished quiz so the topic picker starts fresh"""
+    st.session_state.current_quiz = None
+    st.session_state.quiz_result = None
+
+
+def go_to_page(page_id):
+    """Button callback: switch pages before the rerun the click triggers"""
+    st.session_state.page = page_id
+
+
+def render_results(result):
+    """Score cards, feedback, review and follow-up actions for a submitted quiz"""
+    st.markdown("---")
+    st.header("🎉 Quiz Complete!", anchor=False)
+    
+    # Score cards with next difficulty recommendation
+    score = result.get('score', 0)
+    percentage = result.get('percentage', 0)
+    points_earned = result.get('points_earned', 0)
+    leveled_up = result.get('leveled_up')
+    level = result.get('new_level', 1) if leveled_up else result.get('current_level', 1)
+    feedback_msg = result.get('feedback_message', result.get('feedback', ''))
+    insight_msg = result.get('insight', '')
+    badges = result.get('badges_earned', [])
+    next_diff = result.get('next_difficulty', 'medium').upper()
+    diff_emoji = DIFFICULTY_EMOJI.get(next_diff, "🔴")
+    
+    metrics = (
+        ("📊 Score", f"{score}/100"),
+        ("✨ Percentage", f"{percentage:.0f}%"),
+        ("💎 Points", f"+{points_earned}"),
+        ("🎊 Level" if leveled_up else "📈 Level", f"Lvl {level}"),
+    )
+    for col, (label, value) in zip(st.columns(4, gap="small"), metrics):
+        col.metric(label, value)
+    
+    # Feedback with next difficulty recommendation
+    st.markdown("")
+    st.info(f"💡 **Feedback:** {feedback_msg}\n\n📈 **Next Steps:** {insight_msg}\n\n{diff_emoji} **Next Quiz:** {next_diff}")
+    
+    # Badges
+    if badges:
+        badge_names = ", ".join([b['name'] for b in badges])
+        st.success(f"🏆 **New Badges Earned:** {badge_names}")
+    
+    # Detailed feedback
+    st.markdown("---")
+    st.subheader("📝 Detailed Review", anchor=False)
     
-    # Load topics based on age if not already loaded
-    if not st.session_state.available_topics:
-        with st.spinner("📚 Loading age-appropriate topics..."):
-            try:
-                response = requests.post(
-                    f"{API_BASE_URL}/topics/suggestions",
-                    json={
-                        "user_id": st.session_state.user_id,
-                        "age": st.session_state.user_age
-                    },
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    st.session_state.available_topics = data.get("topics", [])
-                else:
-                    st.session_state.available_topics = [
-                        "Money Basics",
-                        "Saving Money",
-                        "Budgeting",
-                        "Earning Money",
-                        "Understanding Credit",
-                        "Introduction to Investing"
-                    ]
-            except Exception as e:
-                st.warning(f"Could not load topics from server: {e}")
-                st.session_state.available_topics = [
-                    "Money Basics",
-                    "Saving Money",
-                    "Budgeting",
-                    "Earning Money",
-                    "Understanding Credit",
-                    "Introduction to Investing"
-                ]
+    render_review(result.get('question_feedback', []))
     
-    # Quiz configuration section - only topic selection (no difficulty)
-    col1, col2 = st.columns([2, 1], gap="small")
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2, gap="medium")
     
+    # State changes run as callbacks, so each click costs one script run, not two
     with col1:
-        topic = st.selectbox(
-            "📚 Choose a Topic:",
-            st.session_state.available_topics,
-            key="topic_select"
-        )
+        st.button("📚 Take Another Quiz", key="another_quiz", use_container_width=True, on_click=start_another_quiz)
     
     with col2:
-        st.markdown("<p style='margin: 0; color: transparent;'>Generate</p>", unsafe_allow_html=True)
-        generate_btn = st.button("🚀 Generate Quiz", key="generate_quiz", use_container_width=True)
+        st.button("📈 View Progress", key="view_progress", use_container_width=True, on_click=go_to_page, args=("progress",))
+
+
+def explore_page():
+    """Unified Home + Take Quiz page with age-based topic suggestions"""
+    
+    st.header("🎯 Take a Quiz", anchor=False)
+    st.markdown(f"<p style='font-size: 1rem; color: #64748b; margin: 0 0 1.5rem 0;'>Hello {st.session_state.username}! Choose a topic and start learning (difficulty will be auto-selected based on your performance)</p>", unsafe_allow_html=True)
+    
+    # Topics based on age: the list that came with login, otherwise
+    # cached per (user_id, age) across reruns and sessions
+    try:
+        topics = st.session_state.login_topics or fetch_topics(st.session_state.user_id, st.session_state.user_age)
+    except Exception as e:
+        st.warning(f"Could not load topics from server: {e}")
+        topics = DEFAULT_TOPICS
+    
+    # Quiz configuration section - only topic selection (no difficulty).
+    # Inside a form, changing the topic does not rerun the script until submit.
+    with st.form("quiz_config", clear_on_submit=False, border=False):
+        col1, col2 = st.columns([2, 1], gap="small", vertical_alignment="bottom")
+        
+        with col1:
+            topic = st.selectbox(
+                "📚 Choose a Topic:",
+                topics,
+                key="topic_select"
+            )
+        
+        with col2:
+            generate_btn = st.form_submit_button("🚀 Generate Quiz", use_container_width=True)
     
     if generate_btn:
         with st.spinner("✨ Generating personalized quiz... This may take a moment..."):
             try:
-                response = requests.post(
+                response = http().post(
                     f"{API_BASE_URL}/quiz/generate",
                     json={
                         "user_id": st.session_state.user_id,
                         "topic": topic
                     },
-                    timeout=120
+                    timeout=(CONNECT_TIMEOUT, 120)
                 )
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = parse_json(response)
                     st.session_state.current_quiz = data
                     st.session_state.current_answers = []
+                    save_cached_quiz(st.session_state.user_id, topic, data)
                     st.rerun()
                 else:
                     st.error(f"❌ Error: {response.text}")
             except Exception as e:
                 st.error(f"❌ Connection error: {e}")
     
+    # Resume an unfinished quiz for this topic instead of regenerating it
+    if not st.session_state.current_quiz:
+        cached_quiz = load_cached_quiz(st.session_state.user_id, topic)
+        if cached_quiz:
+            st.session_state.current_quiz = cached_quiz
+    
     # Display quiz if generated
     if st.session_state.current_quiz:
         quiz = st.session_state.current_quiz
@@ -870,59 +675,52 @@ def explore_page():
         
         # Display difficulty tag
         difficulty = quiz.get('difficulty', 'medium').upper()
-        difficulty_emoji = "🟢" if difficulty == "EASY" else ("🟡" if difficulty == "MEDIUM" else "🔴")
-        st.markdown(f"""
-        <div style='display: flex; align-items: center; margin-bottom: 1rem;'>
-            <span style='font-size: 1.5rem; margin-right: 0.5rem;'>{difficulty_emoji}</span>
-            <span style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 6px 14px; border-radius: 20px; font-weight: 600; font-size: 0.875rem;'>
-                {difficulty} Difficulty
-            </span>
-        </div>
-        """, unsafe_allow_html=True)
+        badge_html = DIFFICULTY_BADGE_HTML.get(difficulty) or difficulty_badge(difficulty)
+        st.markdown(badge_html, unsafe_allow_html=True)
         
         # Display questions directly
-        st.markdown("<h3>❓ Questions</h3>", unsafe_allow_html=True)
+        st.subheader("❓ Questions", anchor=False)
         
         questions = quiz.get("questions", [])
         answers = []
+        total = len(questions)
+        request_id = quiz.get("request_id", "")
         
-        for i, question in enumerate(questions):
-            st.markdown(f"""
-            <div class='question-box'>
-                <strong>Question {i+1} of {len(questions)}</strong><br>
-                <h4 style='margin: 8px 0 0 0;'>{question.get('question', '')}</h4>
-            </div>
-            """, unsafe_allow_html=True)
+        # One form for all questions: picking answers doesn't rerun the script
+        with st.form("quiz_form", clear_on_submit=False, border=False):
+            for i, question in enumerate(questions):
+                st.markdown(
+                    QUESTION_BOX_TEMPLATE.format(number=i + 1, total=total, question=question.get('question', '')),
+                    unsafe_allow_html=True
+                )
+                
+                # Radio values stay option indices; labels are built once per question
+                option_labels = [f"  {option}" for option in question.get("options", [])]
+                selected = st.radio(
+                    "Select your answer:",
+                    options=range(len(option_labels)),
+                    format_func=option_labels.__getitem__,
+                    index=None,
+                    key=f"q_{i}_{request_id}",
+                    label_visibility="collapsed"
+                )
+                
+                answers.append(selected)
             
-            options = question.get("options", [])
-            selected = st.radio(
-                "Select your answer:",
-                options=list(range(len(options))),
-                format_func=lambda x: f"  {options[x]}",
-                index=None,
-                key=f"q_{i}_{st.session_state.current_quiz['request_id']}",
-                label_visibility="collapsed"
-            )
+            st.markdown("---")
             
-            answers.append(selected)
-            st.session_state.current_answers = answers
-        
-        st.markdown("---")
-        
-        # Submit button
-        col1, col2, col3 = st.columns([1, 1, 1])
-        
-        with col2:
-            submit_btn = st.button("✅ Submit Answers", key="submit_quiz", use_container_width=True)
+            # Submit button
+            submit_btn = centered_submit_button("✅ Submit Answers")
         
         if submit_btn:
+            st.session_state.current_answers = answers
             # Check if all questions answered
             if None in answers:
                 st.error("⚠️ Please answer all questions before submitting!")
             else:
                 with st.spinner("📊 Evaluating your answers..."):
                     try:
-                        response = requests.post(
+                        response = http().post(
                             f"{API_BASE_URL}/submit/answers",
                             json={
                                 "user_id": st.session_state.user_id,
@@ -930,105 +728,107 @@ def explore_page():
                                 "answers": answers,
                                 "topic": topic
                             },
-                            timeout=30
+                            timeout=(CONNECT_TIMEOUT, 30)
                         )
                         
                         if response.status_code == 200:
-                            result = response.json()
+                            result = parse_json(response)
                             st.session_state.quiz_result = result
-                            st.rerun()
+                            clear_cached_quiz(st.session_state.user_id, topic)
+                            # Covered topics change; fetch fresh suggestions while the results are read
+                            st.session_state.login_topics = None
+                            prefetch_topics(st.session_state.user_id, st.session_state.user_age)
+                            # Points and rank changed; refetch this user's stats once
+                            fetch_stats.clear(st.session_state.user_id)
+                            fetch_dashboard.clear()
+                            prefetch_user_data(st.session_state.user_id)
+                            # No rerun: the results block below renders in this pass
                         else:
                             st.error(f"❌ Error: {response.text}")
                     except Exception as e:
                         st.error(f"❌ Connection error: {e}")
     
     # Display results if available
-    if hasattr(st.session_state, 'quiz_result') and st.session_state.quiz_result is not None:
-        result = st.session_state.quiz_result
-        
-        st.markdown("---")
-        st.markdown("<h2>🎉 Quiz Complete!</h2>", unsafe_allow_html=True)
-        
-        # Score cards with next difficulty recommendation
-        next_diff = result.get('next_difficulty', 'medium').upper()
-        diff_emoji = "🟢" if next_diff == "EASY" else ("🟡" if next_diff == "MEDIUM" else "🔴")
-        
-        col1, col2, col3, col4 = st.columns(4, gap="small")
-        
-        with col1:
-            st.metric("📊 Score", f"{result.get('score', 0)}/100")
-        with col2:
-            st.metric("✨ Percentage", f"{result.get('percentage', 0):.0f}%")
-        with col3:
-            st.metric("💎 Points", f"+{result.get('points_earned', 0)}")
-        with col4:
-            if result.get('leveled_up'):
-                st.metric("🎊 Level", f"Lvl {result.get('new_level', 1)}")
-            else:
-                st.metric("📈 Level", f"Lvl {result.get('current_level', 1)}")
-        
-        # Feedback with next difficulty recommendation
-        st.markdown("")
-        feedback_msg = result.get('feedback_message', result.get('feedback', ''))
-        insight_msg = result.get('insight', '')
-        st.info(f"💡 **Feedback:** {feedback_msg}\n\n📈 **Next Steps:** {insight_msg}\n\n{diff_emoji} **Next Quiz:** {next_diff}")
-        
-        # Badges
-        badges = result.get('badges_earned', [])
-        if badges:
-            badge_names = ", ".join([b['name'] for b in badges])
-            st.success(f"🏆 **New Badges Earned:** {badge_names}")
-        
-        # Detailed feedback
-        st.markdown("---")
-        st.markdown("<h3>📝 Detailed Review</h3>", unsafe_allow_html=True)
-        
-        for idx, qf in enumerate(result.get('question_feedback', [])):
-            status_icon = "✅" if qf['is_correct'] else "❌"
-            
-            with st.expander(f"{status_icon} Question {idx+1}: {qf['question'][:60]}..."):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.write("**Your Answer:**")
-                    st.info(qf['user_answer'])
-                
-                with col2:
-                    if not qf['is_correct']:
-                        st.write("**Correct Answer:**")
-                        st.success(qf['correct_answer'])
-                
-                st.write("**Explanation:**")
-                st.write(qf['explanation'])
-        
-        st.markdown("---")
-        
-        col1, col2 = st.columns(2, gap="medium")
-        
-        with col1:
-            if st.button("📚 Take Another Quiz", key="another_quiz", use_container_width=True):
-                st.session_state.current_quiz = None
-                st.session_state.quiz_result = None
-                st.rerun()
-        
-        with col2:
-            if st.button("📈 View Progress", key="view_progress", use_container_width=True):
-                st.session_state.page = "progress"
-                st.rerun()
+    result = st.session_state.get("quiz_result")
+    if result is not None:
+        render_results(result)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_stats(user_id):
+    """Fetch a user's gamification stats; shared by Progress and Leaderboard.
+
+    Stats only change when a quiz is submitted, which clears this user's
+    entry, so the TTL is a backstop rather than the refresh mechanism.
+    """
+    response = http().get(f"{API_BASE_URL}/gamification/stats/{user_id}", timeout=10)
+    response.raise_for_status()
+    return parse_json(response)
+
+
+@st.cache_resource
+def dashboard_validators():
+    """Process-wide user_id -> (ETag, body) of the last dashboard response"""
+    return {}
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_dashboard(user_id):
+    """Fetch the leaderboard and this user's stats in one round trip.
+
+    Revalidates with If-None-Match, so when the TTL lapses on unchanged data
+    the backend answers 304 and the previous body is reused without re-parsing.
+    """
+    validators = dashboard_validators()
+    etag, body = validators.get(user_id, (None, None))
+    headers = {"If-None-Match": etag} if etag else None
+    response = http().get(f"{API_BASE_URL}/gamification/dashboard/{user_id}", headers=headers, timeout=10)
+    if response.status_code == 304:
+        return body
+    response.raise_for_status()
+    body = parse_json(response)
+    if "ETag" in response.headers:
+        validators[user_id] = (response.headers["ETag"], body)
+    return body
+
+
+def refresh_button(key):
+    """Render a Refresh button that drops cached stats and leaderboard data"""
+    if st.button("🔄 Refresh", key=key, help="Reload the latest stats"):
+        fetch_stats.clear(st.session_state.user_id)
+        fetch_dashboard.clear()
+
+
+# Bound once at import; each Recent Quizzes row is a single format call
+RECENT_QUIZ_ROW = (
+    "<div class='recent-quiz-row'>"
+    "<strong>{topic}</strong><strong>{percentage:.0f}%</strong>"
+    "<span>{emoji} {difficulty}</span><span>Lvl {level}</span><span>📅 {date}</span>"
+    "</div>"
+).format
+
+
+def recent_quiz_row(quiz):
+    """Render one recent quiz as a row of the Recent Quizzes grid"""
+    difficulty = quiz.get('difficulty', 'medium').upper()
+    return RECENT_QUIZ_ROW(
+        topic=quiz.get('topic'),
+        percentage=quiz.get('percentage'),
+        emoji=DIFFICULTY_EMOJI.get(difficulty, "🔴"),
+        difficulty=difficulty,
+        level=quiz.get('level', 1),
+        date=quiz.get('date', 'N/A')
+    )
 
 
 def progress_page():
     """My Progress page"""
-    st.markdown("<h2>📈 Your Progress</h2>", unsafe_allow_html=True)
+    st.header("📈 Your Progress", anchor=False)
+    refresh_button("refresh_progress")
     
     try:
-        response = requests.get(
-            f"{API_BASE_URL}/gamification/stats/{st.session_state.user_id}"
-        )
-        
-        if response.status_code == 200:
-            stats = response.json()
-            
+        stats = fetch_stats(st.session_state.user_id)
+        if stats:
             # Stats cards
             col1, col2, col3, col4 = st.columns(4, gap="small")
             with col1:
@@ -1040,47 +840,23 @@ def progress_page():
             with col4:
                 st.metric("📊 Avg", f"{stats.get('average_score', 0):.0f}%")
             
-            st.markdown("---")
-            
             # Badges section
-            st.markdown("<h3>🏆 Badges Earned</h3>", unsafe_allow_html=True)
+            st.markdown("<hr/><h3>🏆 Badges Earned</h3>", unsafe_allow_html=True)
             badges = stats.get('badges', [])
             if badges:
-                badge_cols = st.columns(min(4, len(badges)), gap="small")
-                for idx, badge in enumerate(badges):
-                    with badge_cols[idx % 4]:
-                        st.markdown(f"""
-                        <div class='card' style='text-align: center; padding: 16px;'>
-                            <div style='font-size: 2rem;'>🏅</div>
-                            <p style='margin: 8px 0 0 0; font-weight: 600; font-size: 0.9rem;'>{badge}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                badge_cards = "".join(
+                    f"<div class='card badge-card'><div style='font-size: 2rem;'>🏅</div><p>{badge}</p></div>"
+                    for badge in badges
+                )
+                st.markdown(f"<div class='badge-grid'>{badge_cards}</div>", unsafe_allow_html=True)
             else:
                 st.info("No badges yet. Keep playing to earn them!")
             
-            st.markdown("---")
-            
             # Recent quizzes with difficulty tags
-            st.markdown("<h3>📚 Recent Quizzes</h3>", unsafe_allow_html=True)
+            st.markdown("<hr/><h3>📚 Recent Quizzes</h3>", unsafe_allow_html=True)
             recent = stats.get('recent_quizzes', [])
             if recent:
-                for idx, quiz in enumerate(recent):
-                    difficulty = quiz.get('difficulty', 'medium').upper()
-                    difficulty_emoji = "🟢" if difficulty == "EASY" else ("🟡" if difficulty == "MEDIUM" else "🔴")
-                    
-                    col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 0.8, 1], gap="small")
-                    with col1:
-                        st.write(f"**{quiz.get('topic')}**")
-                    with col2:
-                        st.write(f"**{quiz.get('percentage'):.0f}%**")
-                    with col3:
-                        st.markdown(f"{difficulty_emoji} {difficulty}")
-                    with col4:
-                        st.write(f"Lvl {quiz.get('level', 1)}")
-                    with col5:
-                        st.write(f"📅 {quiz.get('date', 'N/A')}")
-                    if idx < len(recent) - 1:
-                        st.divider()
+                st.markdown("".join(map(recent_quiz_row, recent)), unsafe_allow_html=True)
             else:
                 st.info("No quizzes taken yet. Take your first quiz!")
     
@@ -1088,79 +864,57 @@ def progress_page():
         st.error(f"Error loading progress: {e}")
 
 
+RANK_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+LEADERBOARD_HEADER_HTML = (
+    "<div class='leaderboard-header'>"
+    "<div>Rank</div><div>Name</div><div>Level</div>"
+    "<div>Points</div><div>Quizzes</div><div>Avg Score</div>"
+    "</div>"
+)
+LEADERBOARD_ROW = (
+    "<div class='leaderboard-row'>"
+    "<div>{medal}</div><div>{name}</div><div>⭐ {level}</div>"
+    "<div>💎 {points}</div><div>📚 {quizzes}</div><div>📊 {avg:.0f}%</div>"
+    "</div>"
+).format
+
+
+def rank_label(rank):
+    """Medal for the podium, '#rank' for everyone else"""
+    return RANK_MEDALS.get(rank) or f"#{rank}"
+
+
 def leaderboard_page():
     """Leaderboard page with detailed stats"""
-    st.markdown("<h2>🏅 Top Performers</h2>", unsafe_allow_html=True)
+    st.header("🏅 Top Performers", anchor=False)
+    refresh_button("refresh_leaderboard")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/gamification/leaderboard")
-        
-        if response.status_code == 200:
-            data = response.json()
+        data = fetch_dashboard(st.session_state.user_id)
+        if data:
             leaderboard = data.get('leaderboard', [])
             
             if leaderboard:
-                st.markdown("""
-                <style>
-                .leaderboard-header {
-                    display: grid;
-                    grid-template-columns: 0.5fr 2fr 1fr 1fr 1fr 1fr;
-                    gap: 1rem;
-                    padding: 1rem;
-                    background: linear-gradient(135deg, #667eea15 0%, #764ba215 100%);
-                    border-radius: 8px;
-                    font-weight: 600;
-                    color: #1e293b;
-                    margin-bottom: 1rem;
-                }
-                .leaderboard-row {
-                    display: grid;
-                    grid-template-columns: 0.5fr 2fr 1fr 1fr 1fr 1fr;
-                    gap: 1rem;
-                    padding: 1rem;
-                    border-bottom: 1px solid #e2e8f0;
-                    align-items: center;
-                }
-                </style>
-                """, unsafe_allow_html=True)
-                
-                # Header
-                st.markdown("""
-                <div class='leaderboard-header'>
-                    <div>Rank</div>
-                    <div>Name</div>
-                    <div>Level</div>
-                    <div>Points</div>
-                    <div>Quizzes</div>
-                    <div>Avg Score</div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Rows
-                for idx, entry in enumerate(leaderboard):
-                    medal = "🥇" if entry['rank'] == 1 else ("🥈" if entry['rank'] == 2 else ("🥉" if entry['rank'] == 3 else f"#{entry['rank']}"))
-                    avg_score = entry.get('average_score', 0)
-                    quizzes = entry.get('quizzes_completed', 0)
-                    
-                    st.markdown(f"""
-                    <div class='leaderboard-row'>
-                        <div style='font-size: 1.2rem;'>{medal}</div>
-                        <div style='font-weight: 600;'>{entry['name']}</div>
-                        <div>⭐ {entry['level']}</div>
-                        <div>💎 {entry['points']}</div>
-                        <div>📚 {quizzes}</div>
-                        <div>📊 {avg_score:.0f}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                # Header and all rows go out as a single element
+                rows_html = "".join(
+                    LEADERBOARD_ROW(
+                        medal=rank_label(entry['rank']),
+                        name=entry['name'],
+                        level=entry['level'],
+                        points=entry['points'],
+                        quizzes=entry.get('quizzes_completed', 0),
+                        avg=entry.get('average_score', 0)
+                    )
+                    for entry in leaderboard
+                )
+                st.markdown(LEADERBOARD_HEADER_HTML + rows_html, unsafe_allow_html=True)
                 
                 # Add user's own stats if not in top 10
-                st.markdown("---")
-                st.markdown("<h3>📍 Your Position</h3>", unsafe_allow_html=True)
+                st.markdown("<hr/><h3>📍 Your Position</h3>", unsafe_allow_html=True)
                 
                 try:
-                    user_response = requests.get(f"{API_BASE_URL}/gamification/stats/{st.session_state.user_id}")
-                    if user_response.status_code == 200:
-                        user_stats = user_response.json()
+                    user_stats = data.get('user_stats')
+                    if user_stats:
                         user_rank = user_stats.get('rank', 'N/A')
                         
                         col1, col2, col3, col4 = st.columns(4, gap="small")
@@ -1181,14 +935,75 @@ def leaderboard_page():
         st.error(f"Error loading leaderboard: {e}")
 
 
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_health():
+    """Probe the backend health endpoint; returns (status_code, payload)"""
+    try:
+        response = http().get(f"{BACKEND_URL}/health", timeout=2)
+    except Exception:
+        return None, None
+    if response.status_code != 200:
+        return response.status_code, None
+    return response.status_code, parse_json(response)
+
+
+# Per-session re-probe interval: starts at fetch_health's TTL and stretches
+# while the backend stays healthy and unchanged; any change or error resets it
+HEALTH_PROBE_MIN_INTERVAL = 10
+HEALTH_PROBE_MAX_INTERVAL = 60
+
+
+def current_health():
+    """Latest (status_code, payload), re-probed on an adaptive backoff"""
+    now = time.time()
+    if now < st.session_state.get("health_next_probe_at", 0):
+        return st.session_state.health_result
+    
+    result = fetch_health()
+    interval = st.session_state.get("health_interval", HEALTH_PROBE_MIN_INTERVAL)
+    if result[0] == 200 and result == st.session_state.get("health_result"):
+        interval = min(interval * 1.5, HEALTH_PROBE_MAX_INTERVAL)
+    else:
+        interval = HEALTH_PROBE_MIN_INTERVAL
+    
+    st.session_state.health_result = result
+    st.session_state.health_interval = interval
+    st.session_state.health_next_probe_at = now + interval
+    return result
+
+
+@st.cache_resource
+def background_executor():
+    """Process-wide worker pool for fire-and-forget prefetches"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="moneytales-prefetch")
+
+
+def prefetch_health():
+    """Warm the health cache off the script thread right after sign-in"""
+    st.session_state.health_future = background_executor().submit(fetch_health)
+
+
+def prefetch_topics(user_id, age):
+    """Refresh topic suggestions off the script thread for the next quiz"""
+    fetch_topics.clear(user_id, age)
+    background_executor().submit(fetch_topics, user_id, age)
+
+
+def prefetch_user_data(user_id):
+    """Warm the Progress and Leaderboard caches in parallel, off the script thread"""
+    executor = background_executor()
+    executor.submit(fetch_stats, user_id)
+    executor.submit(fetch_dashboard, user_id)
+
+
 def settings_page():
     """Settings page"""
-    st.markdown("<h2>⚙️ Settings & Information</h2>", unsafe_allow_html=True)
+    st.header("⚙️ Settings & Information", anchor=False)
     
     col1, col2 = st.columns(2, gap="medium")
     
     with col1:
-        st.markdown("<h3>👤 User Profile</h3>", unsafe_allow_html=True)
+        st.subheader("👤 User Profile", anchor=False)
         st.write(f"**Current User:** {st.session_state.username}")
         st.write(f"**User ID:** {st.session_state.user_id}")
         
@@ -1202,34 +1017,31 @@ def settings_page():
         st.markdown("<h3 style='color: #ef4444;'>🚪 Sign Out</h3>", unsafe_allow_html=True)
         st.markdown("<p style='color: #64748b; margin-bottom: 1rem;'>Sign out of your account and return to the login page</p>", unsafe_allow_html=True)
         
-        if st.button("🚪 Sign Out", use_container_width=True, key="logout_btn"):
-            st.session_state.authenticated = False
-            st.session_state.username = None
-            st.session_state.user_id = None
-            st.session_state.current_quiz = None
-            st.session_state.page = "explore"
-            st.success("✅ Signed out successfully!")
-            import time
-            time.sleep(1)
-            st.rerun()
+        st.button("🚪 Sign Out", use_container_width=True, key="logout_btn", on_click=sign_out)
     
     with col2:
-        st.markdown("<h3>🔧 System Status</h3>", unsafe_allow_html=True)
-        try:
-            response = requests.get("http://localhost:8000/health", timeout=5)
-            if response.status_code == 200:
-                health = response.json()
+        st.subheader("🔧 System Status", anchor=False)
+        if st.button("🔄 Refresh status", key="refresh_health", help="Check the backend again now"):
+            fetch_health.clear()
+            st.session_state.pop("health_next_probe_at", None)
+            st.session_state.pop("health_interval", None)
+        health_future = st.session_state.get("health_future")
+        if health_future is not None and not health_future.done():
+            st.info("⏳ Checking backend...")
+        else:
+            status, health = current_health()
+            if status == 200:
                 st.success("✅ Backend Connected")
                 st.write(f"**Database:** {health.get('database', 'Unknown')}")
                 st.write(f"**RAG:** {health.get('rag', 'Unknown')}")
-            else:
+            elif status is not None:
                 st.error("❌ Backend Error")
-        except:
-            st.error("❌ Backend Disconnected")
+            else:
+                st.error("❌ Backend Disconnected")
     
     st.markdown("---")
     
-    st.markdown("<h3>📚 About MoneyTales</h3>", unsafe_allow_html=True)
+    st.subheader("📚 About MoneyTales", anchor=False)
     st.markdown("""
     **MoneyTales** is an AI-powered financial education platform designed to teach children about money management through engaging stories and interactive quizzes.
     
@@ -1248,35 +1060,48 @@ def settings_page():
     """)
 
 
+FOOTER_HTML = """
+<hr/>
+<div style='text-align: center; color: #94a3b8; font-size: 0.875rem;'>
+    <p>💰 <strong>MoneyTales</strong> - Financial Education for Kids | v1.0</p>
+    <p>Powered by AI Agents & RAG • FastAPI Backend • Streamlit Frontend</p>
+</div>
+"""
+
+# Page id -> render function, matching the ids in NAV_ITEMS
+PAGE_RENDERERS = {
+    "explore": explore_page,
+    "progress": progress_page,
+    "leaderboard": leaderboard_page,
+    "settings": settings_page,
+}
+
+
 def main():
     """Main application"""
+    show_flash_messages()
+    
     # Check if user is authenticated
     if not st.session_state.authenticated:
         login_page()
         return
     
-    # User is authenticated, show main app
+    # User is authenticated, show main app; warm caches once per signed-in user
+    if st.session_state.get("prefetched_user_id") != st.session_state.user_id:
+        prefetch_health()
+        prefetch_user_data(st.session_state.user_id)
+        st.session_state.prefetched_user_id = st.session_state.user_id
+    
     render_header()
     render_navigation()
     
     # Route to appropriate page
-    if st.session_state.page == "explore":
-        explore_page()
-    elif st.session_state.page == "progress":
-        progress_page()
-    elif st.session_state.page == "leaderboard":
-        leaderboard_page()
-    elif st.session_state.page == "settings":
-        settings_page()
+    render_page = PAGE_RENDERERS.get(st.session_state.page)
+    if render_page is not None:
+        render_page()
     
     # Footer
-    st.markdown("---")
-    st.markdown("""
-    <div style='text-align: center; color: #94a3b8; font-size: 0.875rem;'>
-        <p>💰 <strong>MoneyTales</strong> - Financial Education for Kids | v1.0</p>
-        <p>Powered by AI Agents & RAG • FastAPI Backend • Streamlit Frontend</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
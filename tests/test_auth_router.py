@@ -0,0 +1,39 @@
+"""Login route tests"""
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import auth_router
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    credentials_file = tmp_path / "credentials.json"
+    monkeypatch.setattr(auth_router, "CREDENTIALS_FILE", credentials_file)
+    auth_router.save_credentials({
+        "zoë": {"user_id": "user_1", "name": "Zoë", "password": "pässwörd🔒", "age": 12},
+    })
+    app = FastAPI()
+    app.include_router(auth_router.setup_auth_router(database=None))
+    return TestClient(app)
+
+
+def test_passwords_match_non_ascii():
+    assert auth_router.passwords_match("pässwörd🔒", "pässwörd🔒")
+    assert not auth_router.passwords_match("pässwörd🔒", "passwörd🔒")
+
+
+def test_login_with_non_ascii_password(client):
+    response = client.post("/api/auth/login", json={"username": "Zoë", "password": "pässwörd🔒"})
+    assert response.status_code == 200
+    assert response.json()["user_id"] == "user_1"
+
+
+def test_login_with_wrong_non_ascii_password(client):
+    response = client.post("/api/auth/login", json={"username": "zoë", "password": "pässwörd"})
+    assert response.status_code == 401